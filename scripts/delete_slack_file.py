@@ -3,7 +3,7 @@
 import argparse
 import logging
 
-from services.message_service import MessageService
+from services.daemon_client import DaemonClient
 
 
 def setup_logger():
@@ -28,14 +28,25 @@ def main():
         description="Slackにアップロードされたファイルを削除します"
     )
     parser.add_argument("file_id", help="削除するファイルのID")
+    parser.add_argument(
+        "--no-daemon", action="store_true", help="デーモンを使わずに直接接続する"
+    )
     args = parser.parse_args()
 
     try:
-        # MessageServiceのインスタンスを作成
-        message_service = MessageService()
+        daemon_client = DaemonClient()
+        if not args.no_daemon and daemon_client.is_available():
+            # 起動中のデーモン経由でファイルを削除
+            result = daemon_client.call("delete_file", file_id=args.file_id)
+        else:
+            # デーモン経由の場合に slack_sdk などを読み込まないよう、ここでインポートする
+            from services.message_service import MessageService
+
+            # MessageServiceのインスタンスを作成
+            message_service = MessageService()
 
-        # ファイルを削除
-        result = message_service.delete_file(args.file_id)
+            # ファイルを削除
+            result = message_service.delete_file(args.file_id)
 
         if result:
             logger.info(f"ファイルの削除に成功しました: {args.file_id}")
@@ -5,15 +5,17 @@ import time
 from datetime import datetime
 from typing import Optional
 
-import requests
-from slack_sdk.socket_mode.response import SocketModeResponse
-
-from services.message_service import MessageService
+from services.daemon_client import DaemonClient
 
 
 def invoke_send_message(
     user_id: str, message: str, download_dir: str, rm: bool = False, wait_time: int = 10
 ):
+    # デーモン経由の場合に slack_sdk などを読み込まないよう、ここでインポートする
+    import requests
+
+    from services.message_service import MessageService
+
     response_received = False
 
     def setup_download_directory() -> str:
@@ -127,6 +129,56 @@ def invoke_send_message(
         logger.error(f"エラーが発生しました: {e}", exc_info=True)
 
 
+def invoke_daemon_client(
+    daemon_client: DaemonClient,
+    user_id: str,
+    message: str,
+    download_dir: str,
+    rm: bool = False,
+    wait_time: int = 10,
+):
+    # DMを送信
+    sent_at = time.time()
+    response = daemon_client.call("send_dm", user_id=user_id, text=message)
+    if not response:
+        print("メッセージの送信に失敗しました")
+        return
+    print(f"メッセージを送信しました: {message}")
+
+    # ファイルが送信されるのを待機
+    print("ファイルの受信を待機中...")
+    event = daemon_client.call(
+        "wait_for_message",
+        user_id=user_id,
+        since=sent_at,
+        wait_time=wait_time,
+        timeout=wait_time + 5,
+    )
+    if not event:
+        return
+
+    for file in event.get("files") or []:
+        url_private = file.get("url_private")
+        filename = file.get("name")
+
+        if url_private and filename:
+            # デーモンのカレントディレクトリに依存しないよう絶対パスで渡す
+            file_path = os.path.abspath(os.path.join(download_dir, filename))
+            try:
+                saved_path = daemon_client.call(
+                    "download_file", url=url_private, path=file_path
+                )
+                print(f"ファイルを保存しました: {saved_path}")
+            except Exception as e:
+                logging.error(f"ファイルのダウンロードに失敗しました: {e}")
+                print("ファイルの保存に失敗しました")
+
+        if rm:
+            file_id = file.get("id")
+            if file_id:
+                daemon_client.call("delete_file", file_id=file_id)
+
+
 def main():
     # コマンドライン引数の解析
     parser = argparse.ArgumentParser(description="Slackでファイルを受信するスクリプト")
@@ -155,8 +207,23 @@ def main():
         default=10,
         help="レスポンスを待機する秒数（デフォルト: 10秒）",
     )
+    parser.add_argument(
+        "--no-daemon", action="store_true", help="デーモンを使わずに直接接続する"
+    )
     args = parser.parse_args()
 
+    daemon_client = DaemonClient()
+    if not args.no_daemon and daemon_client.is_available():
+        invoke_daemon_client(
+            daemon_client,
+            args.user_id,
+            args.message,
+            args.download_dir,
+            rm=args.rm,
+            wait_time=args.wait_time,
+        )
+        return
+
     invoke_send_message(
         args.user_id,
         args.message,
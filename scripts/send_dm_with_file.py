@@ -1,24 +1,69 @@
 #!/usr/bin/env python3
 
 import argparse
+import glob
 import html
 import time
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
-from services.message_service import FileUploadParams, MessageService
+from services.daemon_client import DaemonClient
+
+
+def expand_file_paths(patterns: List[str]) -> List[Path]:
+    """ファイルパス・globパターンを展開する (一致しないものはそのまま残す)"""
+    file_paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern))
+        file_paths.extend(Path(match) for match in matches or [pattern])
+    return file_paths
+
+
+def print_progress(
+    done_files: int, total_files: int, done_bytes: int, total_bytes: int
+):
+    print(
+        f"アップロード中: {done_files}/{total_files} ファイル "
+        f"({done_bytes}/{total_bytes} バイト)"
+    )
+
+
+def report_result(result: dict) -> List[str]:
+    """送信結果を表示し、送信したファイルIDのリストを返す"""
+    if "results" not in result:
+        file_id = result["file"]["id"]
+        print(f"✅ ファイルの送信に成功しました。File ID: {file_id}")
+        return [file_id]
+
+    file_ids = []
+    for file_result in result["results"]:
+        if not isinstance(file_result, dict):
+            file_result = asdict(file_result)
+        if file_result["ok"]:
+            cached = " (再利用)" if file_result["cached"] else ""
+            print(
+                f"✅ {file_result['filename']}: "
+                f"File ID: {file_result['file_id']}{cached}"
+            )
+            file_ids.append(file_result["file_id"])
+        else:
+            print(f"❌ {file_result['filename']}: {file_result['error']}")
+    return file_ids
 
 
 def invoke_message_service(
     user_id: str,
-    file_path: Path,
+    file_paths: List[Path],
     message: str,
     title: Optional[str] = None,
     snippet_type: Optional[str] = None,
     rm: bool = False,
     wait_time: int = 10,
 ):
+    # デーモン経由の場合に slack_sdk などを読み込まないよう、ここでインポートする
+    from services.message_service import FileUploadParams, MessageService
+
     response_received = False
     chat_user_id = user_id
 
@@ -37,30 +82,36 @@ def invoke_message_service(
 
         response_received = True
 
-    if not file_path.exists():
-        print(f"エラー: ファイル '{file_path}' が見つかりません。")
-        return
+    for file_path in file_paths:
+        if not file_path.exists():
+            print(f"エラー: ファイル '{file_path}' が見つかりません。")
+            return
 
     # MessageServiceのインスタンス化
     message_service = MessageService()
     message_service.add_message_handler(message_handler)
     with message_service:
-        # ファイルパラメータの設定
-        file_params = FileUploadParams(
-            file=str(file_path),
-            filename=file_path.name,
-            title=title,
-            snippet_type=snippet_type,
-        )
+        # ファイルパラメータの設定 (複数ファイルの場合は1件のメッセージにまとめて送信)
+        file_params = [
+            FileUploadParams(
+                file=str(file_path),
+                filename=file_path.name,
+                title=title,
+                snippet_type=snippet_type,
+            )
+            for file_path in file_paths
+        ]
 
         # ファイル付きDMの送信
         result = message_service.send_dm(
-            user_id=user_id, text=message, file_params=file_params
+            user_id=user_id,
+            text=message,
+            file_params=file_params[0] if len(file_params) == 1 else file_params,
+            progress_callback=print_progress,
         )
 
-        if result:
-            file_id = result["file"]["id"]
-            print(f"✅ ファイルの送信に成功しました。File ID: {file_id}")
+        if result and result["ok"]:
+            file_ids = report_result(result)
 
             # 返信を待つ
             for _ in range(wait_time):
@@ -72,16 +123,81 @@ def invoke_message_service(
                 print("❌ 相手の反応なし")
 
             if rm:
-                message_service.delete_file(file_id)
+                for file_id in file_ids:
+                    message_service.delete_file(file_id)
 
         else:
             print("❌ ファイルの送信に失敗しました")
 
 
+def invoke_daemon_client(
+    daemon_client: DaemonClient,
+    user_id: str,
+    file_paths: List[Path],
+    message: str,
+    title: Optional[str] = None,
+    snippet_type: Optional[str] = None,
+    rm: bool = False,
+    wait_time: int = 10,
+):
+    for file_path in file_paths:
+        if not file_path.exists():
+            print(f"エラー: ファイル '{file_path}' が見つかりません。")
+            return
+
+    # デーモンのカレントディレクトリに依存しないよう絶対パスで渡す
+    file_params = [
+        {
+            "file": str(file_path.resolve()),
+            "filename": file_path.name,
+            "title": title,
+            "snippet_type": snippet_type,
+        }
+        for file_path in file_paths
+    ]
+
+    # ファイル付きDMの送信
+    sent_at = time.time()
+    result = daemon_client.call(
+        "send_dm",
+        user_id=user_id,
+        text=message,
+        file_params=file_params[0] if len(file_params) == 1 else file_params,
+    )
+
+    if result and result["ok"]:
+        file_ids = report_result(result)
+
+        # 返信を待つ
+        reply = daemon_client.call(
+            "wait_for_message",
+            user_id=user_id,
+            since=sent_at,
+            wait_time=wait_time,
+            timeout=wait_time + 5,
+        )
+        if reply:
+            text = html.unescape(reply.get("text") or "")
+            print(f"受信: User {user_id} said: {text}")
+        else:
+            print("❌ 相手の反応なし")
+
+        if rm:
+            for file_id in file_ids:
+                daemon_client.call("delete_file", file_id=file_id)
+
+    else:
+        print("❌ ファイルの送信に失敗しました")
+
+
 def main():
     parser = argparse.ArgumentParser(description="Slackユーザーにファイルを送信します")
     parser.add_argument("user_id", help="送信先のSlackユーザーID")
-    parser.add_argument("file_path", help="送信するファイルのパス")
+    parser.add_argument(
+        "file_paths",
+        nargs="+",
+        help="送信するファイルのパス（複数指定・globパターン可）",
+    )
     parser.add_argument(
         "--message", "-m", default="ファイルを送信します", help="送信時のメッセージ"
     )
@@ -99,11 +215,29 @@ def main():
         default=10,
         help="レスポンスを待機する秒数（デフォルト: 10秒）",
     )
+    parser.add_argument(
+        "--no-daemon", action="store_true", help="デーモンを使わずに直接接続する"
+    )
     args = parser.parse_args()
+    file_paths = expand_file_paths(args.file_paths)
+
+    daemon_client = DaemonClient()
+    if not args.no_daemon and daemon_client.is_available():
+        invoke_daemon_client(
+            daemon_client,
+            user_id=args.user_id,
+            file_paths=file_paths,
+            message=args.message,
+            title=args.title,
+            snippet_type=args.snippet_type,
+            rm=args.rm,
+            wait_time=args.wait_time,
+        )
+        return
 
     invoke_message_service(
         user_id=args.user_id,
-        file_path=Path(args.file_path),
+        file_paths=file_paths,
         message=args.message,
         title=args.title,
         snippet_type=args.snippet_type,
@@ -116,7 +250,7 @@ if __name__ == "__main__":
     main()
     # invoke_message_service(
     #     user_id="U0868DNBAAC",
-    #     file_path=Path("./README.md"),
+    #     file_paths=[Path("./README.md")],
     #     message="put 勤怠",
     #     snippet_type="text",
     #     rm=True,
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+
+import argparse
+import logging
+import signal
+import sys
+import threading
+
+from services.daemon_server import DaemonServer
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Slackへの接続を維持し、スクリプトからのコマンドを受け付けるデーモン"
+    )
+    parser.add_argument(
+        "--socket", "-s", help="待ち受けるソケットのパス（省略時は SLACK_DAEMON_SOCKET）"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    daemon = DaemonServer(socket_path=args.socket)
+
+    def handle_signal(signum, frame):
+        # serve_forever と同じスレッドから shutdown するとデッドロックするため別スレッドで停止
+        threading.Thread(target=daemon.shutdown).start()
+
+    signal.signal(signal.SIGTERM, handle_signal)
+    signal.signal(signal.SIGINT, handle_signal)
+    # kill -USR1 <pid> でプロファイラの有効・無効を切り替える
+    daemon.message_service.profiler.install_signal_handler(signal.SIGUSR1)
+
+    print(f"デーモンを起動します: {daemon.socket_path}")
+    try:
+        daemon.serve_forever()
+    except RuntimeError as e:
+        print(f"デーモンを起動できませんでした: {e}")
+        sys.exit(1)
+    print("デーモンを停止しました")
+
+
+if __name__ == "__main__":
+    main()
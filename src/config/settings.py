@@ -2,18 +2,57 @@
 Configuration settings for the Slack Assistant Bot Client using Pydantic
 """
 
+import os
 from typing import Optional
 
 from pydantic import BaseModel, Field
 from pydantic_settings import BaseSettings
 
 
+def default_daemon_socket_path() -> str:
+    """ユーザーごとのデーモンのソケットのパス (他のユーザーと共有しない)"""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, "slack-assistant-bot", "daemon.sock")
+    return os.path.join(
+        os.path.expanduser("~"), ".slack-assistant-bot", "daemon.sock"
+    )
+
+
 class SlackSettings(BaseSettings):
     """Slack関連の設定を管理するモデル"""
 
     bot_token: Optional[str] = Field(None, alias="SLACK_BOT_TOKEN")
     app_token: Optional[str] = Field(None, alias="SLACK_APP_TOKEN")
     bot_app_id: Optional[str] = Field(None, alias="SLACK_BOT_APP_ID")
+    upload_cache_path: Optional[str] = Field(None, alias="SLACK_UPLOAD_CACHE_PATH")
+    upload_cache_maxsize: int = Field(1000, alias="SLACK_UPLOAD_CACHE_MAXSIZE")
+    checkpoint_path: Optional[str] = Field(None, alias="SLACK_CHECKPOINT_PATH")
+    catchup_concurrency: int = Field(4, alias="SLACK_CATCHUP_CONCURRENCY")
+    metadata_preload: bool = Field(False, alias="SLACK_METADATA_PRELOAD")
+    metadata_cache_ttl: float = Field(3600.0, alias="SLACK_METADATA_CACHE_TTL")
+    metadata_cache_maxsize: int = Field(10000, alias="SLACK_METADATA_CACHE_MAXSIZE")
+    metadata_negative_ttl: float = Field(60.0, alias="SLACK_METADATA_NEGATIVE_TTL")
+    upload_concurrency: int = Field(4, alias="SLACK_UPLOAD_CONCURRENCY")
+    upload_connect_timeout: float = Field(10.0, alias="SLACK_UPLOAD_CONNECT_TIMEOUT")
+    upload_read_timeout: float = Field(120.0, alias="SLACK_UPLOAD_READ_TIMEOUT")
+    retry_max_attempts: int = Field(3, alias="SLACK_RETRY_MAX_ATTEMPTS")
+    retry_base_delay: float = Field(0.5, alias="SLACK_RETRY_BASE_DELAY")
+    retry_max_delay: float = Field(30.0, alias="SLACK_RETRY_MAX_DELAY")
+    retry_budget: int = Field(20, alias="SLACK_RETRY_BUDGET")
+    circuit_failure_threshold: int = Field(5, alias="SLACK_CIRCUIT_FAILURE_THRESHOLD")
+    circuit_reset_timeout: float = Field(30.0, alias="SLACK_CIRCUIT_RESET_TIMEOUT")
+    profile_enabled: bool = Field(False, alias="SLACK_PROFILE_ENABLED")
+    profile_dir: str = Field("profiles", alias="SLACK_PROFILE_DIR")
+    profile_mode: str = Field("cprofile", alias="SLACK_PROFILE_MODE")
+    profile_sample_rate: float = Field(1.0, alias="SLACK_PROFILE_SAMPLE_RATE")
+    profile_slow_threshold: float = Field(1.0, alias="SLACK_PROFILE_SLOW_THRESHOLD")
+    profile_trace_memory: bool = Field(False, alias="SLACK_PROFILE_TRACE_MEMORY")
+    update_min_interval: float = Field(1.2, alias="SLACK_UPDATE_MIN_INTERVAL")
+    stream_max_chars: int = Field(3900, alias="SLACK_STREAM_MAX_CHARS")
+    daemon_socket_path: str = Field(
+        default_factory=default_daemon_socket_path, alias="SLACK_DAEMON_SOCKET"
+    )
 
     class Config:
         env_file = ".env"
@@ -2,13 +2,22 @@
 Core Slack client implementation
 """
 
+import time
+import uuid
 from typing import Optional
 
-from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
+from slack_sdk.web.async_client import AsyncWebClient
 
 from config.settings import slack_settings
 from utils.logger import get_logger
+from utils.message_dedup import (
+    find_posted_message,
+    history_request,
+    message_metadata,
+    posted_response,
+)
+from utils.retry import CircuitOpenError, RetryPolicy
 
 logger = get_logger(__name__)
 
@@ -16,34 +25,76 @@ logger = get_logger(__name__)
 class SlackClient:
     """Slack Client wrapper class"""
 
-    def __init__(self, token: Optional[str] = None):
+    def __init__(
+        self, token: Optional[str] = None, retry_policy: Optional[RetryPolicy] = None
+    ):
         """Initialize Slack client
 
         Args:
             token (Optional[str]): Slack Bot Token. If not provided, uses SLACK_BOT_TOKEN from environment
+            retry_policy (Optional[RetryPolicy]): Retry policy, can be shared with MessageService
         """
         self.token = token or slack_settings.bot_token
         if not self.token:
             raise ValueError("Slack token is required")
 
-        self.client = WebClient(token=self.token)
+        # リトライは RetryPolicy で行うため、SDK 組み込みのリトライは無効にする
+        self.client = AsyncWebClient(token=self.token, retry_handlers=[])
+        self.retry_policy = retry_policy or RetryPolicy.from_settings()
 
-    async def send_message(self, channel: str, text: str) -> bool:
+    async def send_message(
+        self, channel: str, text: str, client_msg_id: Optional[str] = None
+    ) -> bool:
         """Send message to Slack channel
 
+        Retries embed client_msg_id in the message metadata and look it up in the
+        channel history first, so a post that landed before a timeout is not sent twice.
+
         Args:
             channel (str): Channel ID or name
             text (str): Message text to send
+            client_msg_id (Optional[str]): Message ID used to detect duplicates (generated if omitted)
 
         Returns:
             bool: True if message was sent successfully, False otherwise
         """
+        client_msg_id = client_msg_id or str(uuid.uuid4())
+        started_at = time.time()
+        attempts = 0
+
+        async def post():
+            nonlocal attempts
+            attempts += 1
+            if attempts > 1:
+                posted = await self._find_posted_message(
+                    channel, client_msg_id, started_at
+                )
+                if posted is not None:
+                    return posted_response(channel, posted)
+            return await self.client.chat_postMessage(
+                channel=channel, text=text, metadata=message_metadata(client_msg_id)
+            )
+
         try:
-            response = await self.client.chat_postMessage(channel=channel, text=text)
+            response = await self.retry_policy.acall("chat.postMessage", post)
             return response["ok"]
         except SlackApiError as e:
             logger.error(f"Error sending message: {e.response['error']}")
             return False
+        except CircuitOpenError as e:
+            logger.error(f"Error sending message: {e}")
+            return False
+
+    async def _find_posted_message(
+        self, channel: str, client_msg_id: str, started_at: float
+    ) -> Optional[dict]:
+        method, params = history_request(channel, started_at)
+        try:
+            history = await getattr(self.client, method)(**params)
+        except Exception as e:
+            logger.warning(f"Could not check for duplicate message: {e}")
+            return None
+        return find_posted_message(history, client_msg_id)
 
     async def open_conversation_and_send_message(self, users: str, text: str) -> bool:
         """指定されたユーザーとのDMチャンネルを開き、メッセージを送信する
@@ -56,9 +107,15 @@ class SlackClient:
             bool: 送信成功時True、失敗時False
         """
         try:
-            response = await self.client.conversations_open(users=users)
+            response = await self.retry_policy.acall(
+                "conversations.open",
+                lambda: self.client.conversations_open(users=users),
+            )
             channel_id = response["channel"]["id"]
             return await self.send_message(channel=channel_id, text=text)
         except SlackApiError as e:
             logger.error(f"DM送信エラー: {e.response['error']}")
             return False
+        except CircuitOpenError as e:
+            logger.error(f"DM送信エラー: {e}")
+            return False
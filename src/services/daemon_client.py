@@ -0,0 +1,78 @@
+import json
+import os
+import socket
+from typing import Any, Optional
+
+from config.settings import slack_settings
+
+
+class DaemonError(Exception):
+    """デーモンがエラーを返した場合の例外"""
+
+
+class DaemonClient:
+    """DaemonServer にコマンドを送信するクライアント
+
+    Slack への接続はデーモン側で維持されているため、
+    スクリプトは接続処理なしで即座にコマンドを実行できる。
+    """
+
+    def __init__(self, socket_path: Optional[str] = None, timeout: float = 60.0):
+        """
+        DaemonClientの初期化
+
+        Args:
+            socket_path (Optional[str]): デーモンのソケットのパス (省略時は設定値)
+            timeout (float): 1リクエストあたりのタイムアウト (秒)
+        """
+        self.socket_path = socket_path or slack_settings.daemon_socket_path
+        self.timeout = timeout
+
+    def is_available(self) -> bool:
+        """
+        デーモンが起動しているかどうかを確認
+
+        Returns:
+            bool: デーモンに接続できた場合True
+        """
+        try:
+            self.call("ping", timeout=1.0)
+            return True
+        except (OSError, DaemonError):
+            return False
+
+    def call(self, command: str, timeout: Optional[float] = None, **args) -> Any:
+        """
+        デーモンにコマンドを送信し、結果を取得
+
+        Args:
+            command (str): コマンド名 (例: "send_dm")
+            timeout (Optional[float]): タイムアウト (秒, 省略時は既定値)
+            **args: コマンドの引数
+
+        Returns:
+            Any: コマンドの実行結果
+
+        Raises:
+            DaemonError: デーモンがエラーを返した場合、またはソケットの所有者が異なる場合
+        """
+        # 他のユーザーが用意したソケットにメッセージやファイルのパスを送らない
+        if os.stat(self.socket_path).st_uid != os.getuid():
+            raise DaemonError(
+                f"Socket is not owned by the current user: {self.socket_path}"
+            )
+
+        request = json.dumps({"command": command, "args": args}).encode("utf-8")
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout or self.timeout)
+            sock.connect(self.socket_path)
+            sock.sendall(request + b"\n")
+            with sock.makefile("rb") as reader:
+                line = reader.readline()
+
+        if not line:
+            raise DaemonError("Connection closed by daemon")
+        response = json.loads(line)
+        if not response.get("ok"):
+            raise DaemonError(response.get("error"))
+        return response.get("result")
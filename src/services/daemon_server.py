@@ -0,0 +1,294 @@
+import json
+import logging
+import os
+import socketserver
+import threading
+import time
+from collections import deque
+from dataclasses import asdict
+from typing import List, Optional, Union
+from urllib.parse import urlparse
+
+import requests
+
+from config.settings import slack_settings
+from services.daemon_client import DaemonClient
+from services.message_service import FileUploadParams, MessageService
+
+# ボットトークンを付けてダウンロードしてよいホスト
+SLACK_FILE_HOSTS = ("files.slack.com",)
+
+
+class DaemonServer:
+    """MessageService を常駐させ、Unixドメインソケット経由でコマンドを受け付けるサーバー
+
+    1行1リクエストのJSON ({"command": ..., "args": {...}}) を受け取り、
+    1行のJSON ({"ok": bool, "result": ..., "error": ...}) を返す。
+    接続ごとにスレッドで処理するため、複数クライアントからの同時リクエストに対応する。
+    """
+
+    def __init__(
+        self,
+        message_service: Optional[MessageService] = None,
+        socket_path: Optional[str] = None,
+        event_buffer_size: int = 1000,
+    ):
+        """
+        DaemonServerの初期化
+
+        Args:
+            message_service (Optional[MessageService]): 常駐させるMessageService
+            socket_path (Optional[str]): 待ち受けるソケットのパス (省略時は設定値)
+            event_buffer_size (int): wait_for_message 用に保持する受信イベント数
+        """
+        self.message_service = message_service or MessageService()
+        self.socket_path = socket_path or slack_settings.daemon_socket_path
+        self.server = None
+
+        # ロガーの設定
+        self.logger = logging.getLogger(__name__)
+        self.logger.setLevel(logging.INFO)
+
+        # 受信イベントを保持し、wait_for_message で待機中のクライアントに渡す
+        self.events = deque(maxlen=event_buffer_size)
+        self._events_cond = threading.Condition()
+        self.message_service.add_message_handler(self._on_event)
+
+        # HTTP接続を使い回す
+        self.http = requests.Session()
+
+        self.commands = {
+            "ping": self._cmd_ping,
+            "send_message": self._cmd_send_message,
+            "send_dm": self._cmd_send_dm,
+            "send_message_with_file": self._cmd_send_message_with_file,
+            "send_message_with_files": self._cmd_send_message_with_files,
+            "delete_file": self._cmd_delete_file,
+            "get_channel_history": self._cmd_get_channel_history,
+            "wait_for_message": self._cmd_wait_for_message,
+            "download_file": self._cmd_download_file,
+            "profiler": self._cmd_profiler,
+        }
+
+    def serve_forever(self):
+        """
+        ソケットを開いてリクエストの受け付けを開始 (shutdown() まで戻らない)
+
+        Raises:
+            RuntimeError: 同じソケットで別のデーモンが起動している場合
+        """
+        # ソケットのディレクトリは本人以外が参照できないようにする
+        os.makedirs(
+            os.path.dirname(os.path.abspath(self.socket_path)),
+            mode=0o700,
+            exist_ok=True,
+        )
+        if os.path.exists(self.socket_path):
+            # 応答がなければ前回異常終了したときの残骸とみなして削除する
+            if DaemonClient(self.socket_path).is_available():
+                raise RuntimeError(f"Daemon already running on {self.socket_path}")
+            os.unlink(self.socket_path)
+
+        daemon = self
+
+        class RequestHandler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    if not line.strip():
+                        continue
+                    response = daemon.handle_request(line)
+                    self.wfile.write(response.encode("utf-8") + b"\n")
+                    self.wfile.flush()
+
+        self.server = socketserver.ThreadingUnixStreamServer(
+            self.socket_path, RequestHandler
+        )
+        self.server.daemon_threads = True
+        os.chmod(self.socket_path, 0o600)
+
+        with self.message_service:
+            self.logger.info(f"Daemon listening on {self.socket_path}")
+            try:
+                self.server.serve_forever()
+            finally:
+                self.server.server_close()
+                if os.path.exists(self.socket_path):
+                    os.unlink(self.socket_path)
+
+    def shutdown(self):
+        """サーバーを停止"""
+        if self.server is not None:
+            self.server.shutdown()
+
+    def handle_request(self, line: bytes) -> str:
+        """
+        1件のリクエストを処理
+
+        Args:
+            line (bytes): JSONエンコードされたリクエスト
+
+        Returns:
+            str: JSONエンコードされたレスポンス
+        """
+        try:
+            request = json.loads(line)
+            command = self.commands.get(request.get("command"))
+            if command is None:
+                raise ValueError(f"Unknown command: {request.get('command')}")
+            result = command(**(request.get("args") or {}))
+            return json.dumps({"ok": True, "result": self._to_json(result)})
+        except Exception as e:
+            self.logger.error(f"Error handling daemon request: {e}")
+            return json.dumps({"ok": False, "error": str(e)})
+
+    def _on_event(self, event: dict):
+        with self._events_cond:
+            self.events.append((time.time(), event))
+            self._events_cond.notify_all()
+
+    def _to_json(self, result):
+        # SlackResponse・FileUploadResult はそのままではJSONに変換できない
+        if hasattr(result, "data"):
+            return result.data
+        if isinstance(result, dict) and "results" in result:
+            return dict(result, results=[asdict(r) for r in result["results"]])
+        return result
+
+    def _file_params(
+        self, file_params: Optional[Union[dict, List[dict]]]
+    ) -> Optional[Union[FileUploadParams, List[FileUploadParams]]]:
+        if isinstance(file_params, list):
+            return [FileUploadParams(**params) for params in file_params]
+        return FileUploadParams(**file_params) if file_params else None
+
+    def _cmd_ping(self):
+        return {"pong": True}
+
+    def _cmd_send_message(self, channel_id: str, text: str):
+        return self.message_service.send_message(channel_id, text)
+
+    def _cmd_send_dm(
+        self,
+        user_id: str,
+        text: str,
+        file_params: Optional[Union[dict, List[dict]]] = None,
+    ):
+        return self.message_service.send_dm(
+            user_id, text, file_params=self._file_params(file_params)
+        )
+
+    def _cmd_send_message_with_file(
+        self,
+        channel_id: str,
+        text: str,
+        file_params: dict,
+        thread_ts: Optional[str] = None,
+    ):
+        return self.message_service.send_message_with_file(
+            channel_id, text, self._file_params(file_params), thread_ts=thread_ts
+        )
+
+    def _cmd_send_message_with_files(
+        self,
+        channel_id: str,
+        text: str,
+        files: List[dict],
+        thread_ts: Optional[str] = None,
+    ):
+        return self.message_service.send_message_with_files(
+            channel_id, text, self._file_params(files), thread_ts=thread_ts
+        )
+
+    def _cmd_delete_file(self, file_id: str):
+        return self.message_service.delete_file(file_id)
+
+    def _cmd_get_channel_history(self, channel_id: str, limit: int = 100):
+        return self.message_service.get_channel_history(channel_id, limit=limit)
+
+    def _cmd_wait_for_message(
+        self,
+        user_id: Optional[str] = None,
+        since: Optional[float] = None,
+        wait_time: float = 10.0,
+    ) -> Optional[dict]:
+        """
+        条件に合うメッセージイベントを受信するまで待機
+
+        Args:
+            user_id (Optional[str]): 送信者のユーザーID (省略時は全ユーザー)
+            since (Optional[float]): この時刻以降に受信したイベントのみ対象とする
+            wait_time (float): 待機する秒数
+
+        Returns:
+            Optional[dict]: 受信したイベント。タイムアウトした場合はNone
+        """
+        since = since if since is not None else time.time()
+        deadline = time.monotonic() + wait_time
+
+        def find():
+            for received_at, event in self.events:
+                if received_at < since or event.get("type") != "message":
+                    continue
+                if user_id is None or event.get("user") == user_id:
+                    return event
+            return None
+
+        with self._events_cond:
+            event = find()
+            while event is None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._events_cond.wait(remaining)
+                event = find()
+        return event
+
+    def _cmd_download_file(self, url: str, path: str) -> str:
+        """
+        Slackのファイルをダウンロードして保存
+
+        Args:
+            url (str): ファイルのURL (url_private)
+            path (str): 保存先の絶対パス
+
+        Returns:
+            str: 保存したファイルのパス
+        """
+        # ボットトークンをSlack以外のホストに送らない
+        parsed = urlparse(url)
+        if parsed.scheme != "https" or parsed.hostname not in SLACK_FILE_HOSTS:
+            raise ValueError(f"Not a Slack file URL: {url}")
+        if not os.path.isabs(path):
+            raise ValueError(f"Path must be absolute: {path}")
+
+        token = self.message_service.web_client.token
+        response = self.http.get(url, headers={"Authorization": f"Bearer {token}"})
+        response.raise_for_status()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(response.content)
+        return path
+
+    def _cmd_profiler(self, action: str = "toggle"):
+        """
+        プロファイラを操作
+
+        Args:
+            action (str): "enable", "disable", "toggle", "dump" のいずれか
+
+        Returns:
+            dict: プロファイラの状態と出力したファイルのパス
+        """
+        profiler = self.message_service.profiler
+        paths = []
+        if action == "enable":
+            profiler.enable()
+        elif action == "disable":
+            paths = profiler.disable()
+        elif action == "toggle":
+            profiler.toggle()
+        elif action == "dump":
+            paths = profiler.dump()
+        else:
+            raise ValueError(f"Unknown profiler action: {action}")
+        return {"enabled": profiler.enabled, "paths": paths}
@@ -1,16 +1,37 @@
+import asyncio
 import logging
+import os
 import pprint
+import threading
 import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from io import IOBase
-from typing import Callable, Optional, Union
+from typing import AsyncIterable, Callable, Iterable, List, Optional, Union
 
+import requests
+from requests.adapters import HTTPAdapter
 from slack_sdk import WebClient
 from slack_sdk.socket_mode import SocketModeClient
 from slack_sdk.socket_mode.response import SocketModeResponse
 
 from config.settings import slack_settings
+from services.message_stream import MessageStream
+from services.metadata_service import MetadataService
+from utils.checkpoint_store import CheckpointStore
+from utils.message_dedup import (
+    find_posted_message,
+    history_request,
+    message_metadata,
+    posted_response,
+)
 from utils.ordered_fixed_size_set import OrderedFixedSizeSet
+from utils.profiler import HandlerProfiler
+from utils.rate_limiter import RateLimiter
+from utils.retry import RetryPolicy
+from utils.ttl_lru_cache import TTLLRUCache
+from utils.upload_cache import UploadCache
 
 
 @dataclass
@@ -31,16 +52,51 @@ class FileUploadParams:
     snippet_type: Optional[str] = None
 
 
+@dataclass
+class FileUploadResult:
+    """一括アップロードにおける各ファイルの結果
+
+    Attributes:
+        filename (str): ファイル名
+        ok (bool): アップロードに成功したか
+        file_id (Optional[str]): SlackのファイルID
+        permalink (Optional[str]): ファイルのパーマリンク
+        size (int): ファイルサイズ (バイト)
+        cached (bool): アップロードキャッシュを再利用したか
+        error (Optional[str]): 失敗した場合のエラー内容
+    """
+
+    filename: str
+    ok: bool = False
+    file_id: Optional[str] = None
+    permalink: Optional[str] = None
+    size: int = 0
+    cached: bool = False
+    error: Optional[str] = None
+
+
 class MessageService:
-    def __init__(self):
+    def __init__(
+        self,
+        upload_cache: Optional[UploadCache] = None,
+        checkpoint_store: Optional[CheckpointStore] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+    ):
         """
         MessageServiceの初期化
 
         Args:
-            app_token (str): Slackのアプリレベルトークン (xapp-)
+            upload_cache (Optional[UploadCache]): アップロードキャッシュ。
+                省略時は SLACK_UPLOAD_CACHE_PATH が設定されていれば自動で作成する
+            checkpoint_store (Optional[CheckpointStore]): チャンネルごとの処理済みts。
+                省略時は SLACK_CHECKPOINT_PATH が設定されていれば自動で作成する
+            retry_policy (Optional[RetryPolicy]): Web API呼び出しのリトライポリシー。
+                省略時は設定値から作成する
         """
         self.start_time = time.time()
-        self.web_client = WebClient(token=slack_settings.bot_token)
+        # リトライは RetryPolicy で行うため、SDK 組み込みのリトライは無効にする
+        # (有効なままだと接続エラーが二重にリトライされる)
+        self.web_client = WebClient(token=slack_settings.bot_token, retry_handlers=[])
         self.socket_client = SocketModeClient(
             app_token=slack_settings.app_token, web_client=self.web_client
         )
@@ -53,16 +109,236 @@ class MessageService:
         self.message_handlers = []
         self.socket_client.socket_mode_request_listeners.append(self._handle_message)
         self.processed_messages = OrderedFixedSizeSet(maxsize=100)
+        self._dispatch_lock = threading.Lock()
+
+        # アップロードキャッシュの設定
+        if upload_cache is None and slack_settings.upload_cache_path:
+            upload_cache = UploadCache(
+                slack_settings.upload_cache_path,
+                maxsize=slack_settings.upload_cache_maxsize,
+            )
+        self.upload_cache = upload_cache
+
+        # チェックポイントの設定 (再接続時のキャッチアップに使用)
+        if checkpoint_store is None and slack_settings.checkpoint_path:
+            checkpoint_store = CheckpointStore(slack_settings.checkpoint_path)
+        self.checkpoint_store = checkpoint_store
+        self._catching_up = False
+        self._pending_events = []
+        self._caught_up_keys = set()
+        self._catchup_lock = threading.Lock()
+
+        # 一時的な障害に対するリトライと、再送時の重複投稿防止
+        self.retry_policy = retry_policy or RetryPolicy.from_settings()
+        self.sent_messages = TTLLRUCache(maxsize=1000, ttl=3600.0)
+        # chat.update (Tier 3) はアプリ全体で制限されるため、全ストリームで共有する
+        self.update_limiter = RateLimiter(slack_settings.update_min_interval)
+
+        # ハンドラ・ディスパッチ処理のプロファイラ (enable() で実行中に有効化できる)
+        self.profiler = HandlerProfiler(
+            output_dir=slack_settings.profile_dir,
+            mode=slack_settings.profile_mode,
+            sample_rate=slack_settings.profile_sample_rate,
+            slow_threshold=slack_settings.profile_slow_threshold,
+            trace_memory=slack_settings.profile_trace_memory,
+        )
+        if slack_settings.profile_enabled:
+            self.profiler.enable()
+
+        # ユーザー・チャンネル情報のキャッシュ
+        self.metadata = MetadataService(self.web_client)
+
+        # 一括アップロード用にHTTP接続をプールする
+        self.upload_session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=slack_settings.upload_concurrency,
+            pool_maxsize=slack_settings.upload_concurrency,
+        )
+        self.upload_session.mount("https://", adapter)
 
     def start(self):
-        """SocketModeClientを開始"""
+        """SocketModeClientを開始
+
+        チェックポイントが有効な場合は、停止中に送信されたメッセージを取得して
+        ハンドラに渡してから、接続中に受信したイベントを処理する。
+        """
         self.logger.info("Starting Socket Mode Client...")
+        if slack_settings.metadata_preload:
+            self.metadata.preload()
+        if self.checkpoint_store is None:
+            self.socket_client.connect()
+            return
+
+        # キャッチアップ中に受信したイベントは保留しておく
+        with self._catchup_lock:
+            self._catching_up = True
         self.socket_client.connect()
+        try:
+            self.catch_up()
+        finally:
+            self._drain_pending_events()
 
     def stop(self):
         """SocketModeClientを停止"""
         self.logger.info("Stopping Socket Mode Client...")
         self.socket_client.close()
+        self.profiler.disable()
+        if self.checkpoint_store is not None:
+            self.checkpoint_store.flush()
+
+    def catch_up(self) -> int:
+        """
+        チェックポイント以降のメッセージを取得し、ハンドラに渡す
+
+        チャンネルの履歴に加えて、記録しているスレッドと、取得した履歴のうち
+        チェックポイント以降に返信のあったスレッドの返信も取得する。
+
+        Returns:
+            int: ハンドラに渡したメッセージ数
+        """
+        channels = self.checkpoint_store.channels()
+        tracked_threads = self.checkpoint_store.threads()
+        if not channels and not tracked_threads:
+            return 0
+
+        self.logger.info(
+            f"Catching up {len(channels)} channels and "
+            f"{len(tracked_threads)} threads..."
+        )
+        max_workers = max(1, slack_settings.catchup_concurrency)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(self._fetch_channel_delta, channels))
+
+            # (チャンネルID, スレッドのts) -> 取得を始める返信のts
+            threads = {
+                (channel_id, thread_ts): oldest
+                for channel_id, thread_ts, oldest in tracked_threads
+            }
+            for channel_id, channel_messages in zip(channels, results):
+                checkpoint = self.checkpoint_store.get(channel_id)
+                for message in channel_messages:
+                    latest_reply = message.get("latest_reply")
+                    if latest_reply and float(latest_reply) > float(checkpoint):
+                        threads.setdefault((channel_id, message["ts"]), checkpoint)
+
+            targets = list(threads.items())
+            replies = list(executor.map(self._fetch_thread_delta, targets))
+
+        # ブロードキャストされた返信は履歴とスレッドの両方に含まれるため重複を除く
+        unique = {}
+        for channel_id, channel_messages in zip(channels, results):
+            for message in channel_messages:
+                unique[(channel_id, message["ts"])] = message
+        for ((channel_id, _), _), thread_messages in zip(targets, replies):
+            for message in thread_messages:
+                unique.setdefault((channel_id, message["ts"]), message)
+
+        messages = [
+            dict(message, channel=channel_id)
+            for (channel_id, _), message in unique.items()
+        ]
+        messages.sort(key=lambda message: float(message["ts"]))
+
+        dispatched = 0
+        for event_data in messages:
+            if self._is_own_message(event_data):
+                continue
+            message_key = self._message_key({}, event_data)
+            # 保留中のライブイベントと重複しないよう、渡したメッセージを記録する
+            if self._catching_up:
+                self._caught_up_keys.add(message_key)
+            if self._dispatch(event_data, message_key):
+                dispatched += 1
+        self.logger.info(f"Caught up {dispatched} messages")
+        return dispatched
+
+    def _fetch_channel_delta(self, channel_id: str) -> list:
+        """
+        チェックポイント以降のチャンネル履歴をページングしながら取得
+
+        Args:
+            channel_id (str): チャンネルID
+
+        Returns:
+            list: メッセージのリスト (新しい順)
+        """
+        oldest = self.checkpoint_store.get(channel_id)
+        messages = []
+        cursor = None
+        try:
+            while True:
+                response = self.retry_policy.call(
+                    "conversations.history",
+                    lambda: self.web_client.conversations_history(
+                        channel=channel_id, oldest=oldest, limit=200, cursor=cursor
+                    ),
+                )
+                messages.extend(response.get("messages", []))
+                cursor = (response.get("response_metadata") or {}).get("next_cursor")
+                if not response.get("has_more") or not cursor:
+                    break
+        except Exception as e:
+            self.logger.error(f"Error catching up channel {channel_id}: {e}")
+        return messages
+
+    def _fetch_thread_delta(self, target: tuple) -> list:
+        """
+        指定したts以降のスレッドへの返信をページングしながら取得
+
+        Args:
+            target (tuple): ((チャンネルID, スレッドのts), 取得を始める返信のts)
+
+        Returns:
+            list: 返信のリスト (親メッセージを除く)
+        """
+        (channel_id, thread_ts), oldest = target
+        messages = []
+        cursor = None
+        try:
+            while True:
+                response = self.retry_policy.call(
+                    "conversations.replies",
+                    lambda: self.web_client.conversations_replies(
+                        channel=channel_id,
+                        ts=thread_ts,
+                        oldest=oldest,
+                        limit=200,
+                        cursor=cursor,
+                    ),
+                )
+                # 親メッセージは oldest に関わらず常に含まれる
+                messages.extend(
+                    message
+                    for message in response.get("messages", [])
+                    if message.get("ts") != thread_ts
+                    and float(message.get("ts", 0)) > float(oldest)
+                )
+                cursor = (response.get("response_metadata") or {}).get("next_cursor")
+                if not response.get("has_more") or not cursor:
+                    break
+        except Exception as e:
+            self.logger.error(
+                f"Error catching up thread {thread_ts} in {channel_id}: {e}"
+            )
+        return messages
+
+    def _drain_pending_events(self):
+        """キャッチアップ中に保留したイベントを処理し、通常の受信処理に戻す
+
+        キャッチアップで既にハンドラに渡したメッセージは除外する。
+        """
+        while True:
+            with self._catchup_lock:
+                pending = self._pending_events
+                self._pending_events = []
+                if not pending:
+                    self._catching_up = False
+                    self._caught_up_keys = set()
+                    return
+            for event in pending:
+                message_key = self._message_key(event, event.get("event", {}))
+                if message_key not in self._caught_up_keys:
+                    self._process_event(event)
 
     def add_message_handler(self, handler: Callable):
         """
@@ -86,54 +362,238 @@ class MessageService:
         self.logger.debug(f"Received event: {pprint.pformat(event)}")
 
         # メッセージイベントの処理
-        event_time = event.get("event_time")
+        if event.get("type") == "event_callback":
+            # ユーザー・チャンネル情報の変更はキャッシュに即時反映する
+            self.metadata.handle_event(event.get("event", {}))
+            with self._catchup_lock:
+                if self._catching_up:
+                    self._pending_events.append(event)
+                    event = None
+            if event is not None:
+                if self.profiler.enabled:
+                    with self.profiler.section("_handle_message"):
+                        self._process_event(event)
+                else:
+                    self._process_event(event)
+
+        # # Socket Modeの応答を返す
+        response = SocketModeResponse(envelope_id=req.envelope_id)
+        client.send_socket_mode_response(response)
+
+    def _process_event(self, event: dict):
+        """
+        event_callback のイベントをフィルタしてハンドラに渡す
+
+        Args:
+            event (dict): Socket Modeで受信したペイロード
+        """
         event_data = event.get("event", {})
+        if self._is_own_message(event_data) or not self._is_new_event(event):
+            return
+        self._dispatch(event_data, self._message_key(event, event_data))
 
+    def _is_own_message(self, event_data: dict) -> bool:
         # bot_profileがNoneの場合に対応
         bot_profile = event_data.get("bot_profile") or {}
-        app_id = bot_profile.get("app_id")
+        return bot_profile.get("app_id") == slack_settings.bot_app_id
 
-        message_key = f"{event.get('event_id')}_{event.get('event_time')}"
+    def _is_new_event(self, event: dict) -> bool:
+        """
+        起動後に発生したイベントかどうかを判定
 
-        if (
-            event.get("type") == "event_callback"
-            and app_id != slack_settings.bot_app_id
-            and event_time > self.start_time
-            and message_key not in self.processed_messages
-        ):
+        リスナーは複数のワーカーで並行して実行され、イベントの処理順はtsの順とは
+        限らないため、ライブイベントの重複は processed_messages のキーで判定する。
+        停止中のメッセージはチェックポイントからのキャッチアップで取得する。
+        """
+        return event.get("event_time", 0) > self.start_time
+
+    def _message_key(self, event: dict, event_data: dict) -> str:
+        # 同一メッセージをキャッチアップとライブ受信の両方で処理しないようにする
+        channel_id = event_data.get("channel")
+        ts = event_data.get("ts")
+        if isinstance(channel_id, str) and ts:
+            return f"{event_data.get('type')}_{channel_id}_{ts}"
+        return f"{event.get('event_id')}_{event.get('event_time')}"
+
+    def _dispatch(self, event_data: dict, message_key: str) -> bool:
+        """
+        重複を除外し、登録された全てのハンドラを実行
+
+        Args:
+            event_data (dict): イベントデータ
+            message_key (str): 重複判定用のキー
+
+        Returns:
+            bool: ハンドラを実行した場合True
+        """
+        with self._dispatch_lock:
+            if message_key in self.processed_messages:
+                return False
             self.processed_messages.add(message_key)
-            try:
-                # 登録された全てのハンドラを実行
-                for handler in self.message_handlers:
+
+        try:
+            # 登録された全てのハンドラを実行
+            for handler in self.message_handlers:
+                if self.profiler.enabled:
+                    self.profiler.call_handler(handler, event_data)
+                else:
                     handler(event_data)
-            except Exception as e:
-                self.logger.error(f"Error handling message: {e}", exc_info=True)
+        except Exception as e:
+            self.logger.error(f"Error handling message: {e}", exc_info=True)
 
-        # # Socket Modeの応答を返す
-        response = SocketModeResponse(envelope_id=req.envelope_id)
-        client.send_socket_mode_response(response)
+        channel_id = event_data.get("channel")
+        ts = event_data.get("ts")
+        if (
+            self.checkpoint_store is not None
+            and event_data.get("type") == "message"
+            and isinstance(channel_id, str)
+            and ts
+        ):
+            self.checkpoint_store.update(channel_id, ts)
+            # 返信のあったスレッドは停止中の返信もキャッチアップできるよう記録する
+            thread_ts = event_data.get("thread_ts")
+            if thread_ts:
+                self.checkpoint_store.update_thread(channel_id, thread_ts, ts)
+        return True
 
-    def send_message(self, channel_id: str, text: str) -> Optional[dict]:
+    def send_message(
+        self, channel_id: str, text: str, client_msg_id: Optional[str] = None
+    ) -> Optional[dict]:
         """
         チャンネルにメッセージを送信
 
         Args:
             channel_id (str): 送信先のチャンネルID
             text (str): 送信するメッセージ
+            client_msg_id (Optional[str]): 重複投稿を防ぐためのメッセージID（省略可）
 
         Returns:
             Optional[dict]: 送信結果
         """
         try:
-            response = self.web_client.chat_postMessage(channel=channel_id, text=text)
+            response = self._post_message(
+                channel_id, text=text, client_msg_id=client_msg_id
+            )
             self.logger.info(f"Message sent to channel {channel_id}: {text}")
             return response
         except Exception as e:
             self.logger.error(f"Error sending message: {e}")
             return None
 
+    def send_message_stream(
+        self,
+        channel_id: str,
+        chunks: Iterable[str],
+        thread_ts: Optional[str] = None,
+    ) -> Optional[dict]:
+        """
+        生成途中のテキストを逐次更新しながらチャンネルに送信
+
+        最初のチャンクが届いた時点で投稿し、以降は chat.update で内容を更新する。
+        1件のメッセージに収まらない分はスレッドへの返信として投稿する。
+
+        Args:
+            channel_id (str): 送信先のチャンネルID
+            chunks (Iterable[str]): 送信するテキストのチャンク (ジェネレータなど)
+            thread_ts (Optional[str]): スレッドのタイムスタンプ (スレッドに送信する場合)
+
+        Returns:
+            Optional[dict]: 送信結果 ("messages" に投稿した全メッセージのts を含む)
+        """
+        stream = self._create_message_stream(channel_id, thread_ts)
+        error = None
+        try:
+            for chunk in chunks:
+                stream.write(chunk)
+        except Exception as e:
+            error = e
+        finally:
+            # 途中で失敗しても、それまでのテキストを反映して書きかけのまま残さない
+            response = self._close_message_stream(stream, error)
+        return response
+
+    async def asend_message_stream(
+        self,
+        channel_id: str,
+        chunks: AsyncIterable[str],
+        thread_ts: Optional[str] = None,
+    ) -> Optional[dict]:
+        """
+        send_message_stream() の非同期イテレータ版
+
+        Web APIの呼び出しはスレッドで実行し、イベントループをブロックしない。
+
+        Args:
+            channel_id (str): 送信先のチャンネルID
+            chunks (AsyncIterable[str]): 送信するテキストのチャンク
+            thread_ts (Optional[str]): スレッドのタイムスタンプ (スレッドに送信する場合)
+
+        Returns:
+            Optional[dict]: 送信結果 ("messages" に投稿した全メッセージのts を含む)
+        """
+        stream = self._create_message_stream(channel_id, thread_ts)
+        error = None
+        try:
+            async for chunk in chunks:
+                stream.append(chunk)
+                if stream.needs_flush():
+                    await asyncio.to_thread(stream.flush)
+        except Exception as e:
+            error = e
+        finally:
+            # 途中で失敗・キャンセルされても、それまでのテキストを反映する
+            response = await asyncio.to_thread(
+                self._close_message_stream, stream, error
+            )
+        return response
+
+    def _create_message_stream(
+        self, channel_id: str, thread_ts: Optional[str]
+    ) -> MessageStream:
+        return MessageStream(
+            self._post_message,
+            self._update_message,
+            channel_id,
+            thread_ts=thread_ts,
+            max_chars=slack_settings.stream_max_chars,
+            rate_limiter=self.update_limiter,
+        )
+
+    def _close_message_stream(
+        self, stream: MessageStream, error: Optional[Exception]
+    ) -> Optional[dict]:
+        """
+        ストリームの最新のテキストを反映して送信を完了
+
+        Args:
+            stream (MessageStream): 完了するストリーム
+            error (Optional[Exception]): チャンクの取得・送信中に発生したエラー
+
+        Returns:
+            Optional[dict]: 送信結果。エラーがあった場合は "ok" がFalseで "error" を含む
+        """
+        try:
+            response = stream.close()
+        except Exception as e:
+            self.logger.error(f"Error sending message stream: {e}")
+            return None
+
+        if error is not None:
+            self.logger.error(f"Message stream interrupted: {error}")
+            return dict(response, ok=False, error=str(error))
+        self.logger.info(
+            f"Streamed message sent to channel {stream.channel_id}: "
+            f"{response['length']} chars in {len(response['messages'])} messages"
+        )
+        return response
+
     def send_dm(
-        self, user_id: str, text: str, file_params: Optional[FileUploadParams] = None
+        self,
+        user_id: str,
+        text: str,
+        file_params: Optional[Union[FileUploadParams, List[FileUploadParams]]] = None,
+        progress_callback: Optional[Callable[[int, int, int, int], None]] = None,
+        client_msg_id: Optional[str] = None,
     ) -> Optional[dict]:
         """
         ユーザーにDMを送信。ファイルパラメータが指定された場合は、ファイルも同時に送信。
@@ -141,24 +601,40 @@ class MessageService:
         Args:
             user_id (str): 送信先のユーザーID
             text (str): 送信するメッセージ
-            file_params (Optional[FileUploadParams]): ファイルアップロードに関���るパラメータ（省略可）
+            file_params (Optional[Union[FileUploadParams, List[FileUploadParams]]]):
+                ファイルアップロードに関するパラメータ（省略可）。リストの場合は一括送信
+            progress_callback (Optional[Callable[[int, int, int, int], None]]):
+                一括送信時の進捗を受け取るコールバック (send_message_with_files を参照)
+            client_msg_id (Optional[str]): 重複投稿を防ぐためのメッセージID（省略可）
 
         Returns:
             Optional[dict]: 送信結果
         """
         try:
             # DMチャンネルを開く
-            conversation = self.web_client.conversations_open(users=[user_id])
+            conversation = self.retry_policy.call(
+                "conversations.open",
+                lambda: self.web_client.conversations_open(users=[user_id]),
+            )
             channel_id = conversation["channel"]["id"]
 
             # メッセージパラメータが指定された場合は、ファイル付きメッセージを送信
+            if isinstance(file_params, list):
+                return self.send_message_with_files(
+                    channel_id=channel_id,
+                    text=text,
+                    files=file_params,
+                    progress_callback=progress_callback,
+                )
             if file_params:
                 return self.send_message_with_file(
                     channel_id=channel_id, text=text, file_params=file_params
                 )
 
             # 通常のメッセージを送信
-            response = self.web_client.chat_postMessage(channel=channel_id, text=text)
+            response = self._post_message(
+                channel_id, text=text, client_msg_id=client_msg_id
+            )
             self.logger.info(f"DM sent to user {user_id}: {text}")
             return response
         except Exception as e:
@@ -177,8 +653,11 @@ class MessageService:
             Optional[dict]: メッセージ履歴
         """
         try:
-            result = self.web_client.conversations_history(
-                channel=channel_id, limit=limit
+            result = self.retry_policy.call(
+                "conversations.history",
+                lambda: self.web_client.conversations_history(
+                    channel=channel_id, limit=limit
+                ),
             )
             return result
         except Exception as e:
@@ -205,23 +684,438 @@ class MessageService:
             Optional[dict]: ファイル送信の結果
         """
         try:
+            # 同一内容のファイルがアップロード済みであれば再利用する
+            cache_key = None
+            if self.upload_cache is not None:
+                cache_key = self._upload_cache_key(file_params)
+                cached = self._find_cached_file(cache_key)
+                if cached:
+                    try:
+                        return self._share_cached_file(
+                            channel_id, text, cached, thread_ts=thread_ts
+                        )
+                    except Exception as e:
+                        self.logger.warning(
+                            f"Failed to share cached file {cached['id']}, "
+                            f"uploading instead: {e}"
+                        )
+
             # ファイルを読み込む
+            # (アップロードは途中で失敗すると重複する可能性があるためリトライしない)
             with open(file_params.file, "rb") as file:
-                response = self.web_client.files_upload_v2(
-                    channel=channel_id,
-                    file=file,
-                    filename=file_params.filename,
-                    initial_comment=text,
-                    thread_ts=thread_ts,
-                    title=file_params.title,
-                    snippet_type=file_params.snippet_type,
+                response = self.retry_policy.call(
+                    "files.upload_v2",
+                    lambda: self.web_client.files_upload_v2(
+                        channel=channel_id,
+                        file=file,
+                        filename=file_params.filename,
+                        initial_comment=text,
+                        thread_ts=thread_ts,
+                        title=file_params.title,
+                        snippet_type=file_params.snippet_type,
+                    ),
+                    max_attempts=1,
                 )
             self.logger.info(f"Message and file sent to channel {channel_id}: {text}")
+
+            if cache_key is not None and response.get("file"):
+                uploaded = response["file"]
+                self.upload_cache.put(
+                    cache_key, uploaded["id"], uploaded.get("permalink")
+                )
             return response
         except Exception as e:
             self.logger.error(f"Error sending message with file: {e}")
             return None
 
+    def send_message_with_files(
+        self,
+        channel_id: str,
+        text: str,
+        files: List[FileUploadParams],
+        thread_ts: Optional[str] = None,
+        progress_callback: Optional[Callable[[int, int, int, int], None]] = None,
+    ) -> Optional[dict]:
+        """
+        複数のファイルを並列にアップロードし、1件のメッセージとして送信
+
+        Args:
+            channel_id (str): 送信先のチャンネルID
+            text (str): 送信するメッセージ
+            files (List[FileUploadParams]): アップロードするファイルのリスト
+            thread_ts (Optional[str]): スレッドのタイムスタンプ (スレッドに送信する場合)
+            progress_callback (Optional[Callable[[int, int, int, int], None]]):
+                ファイルの転送完了ごとに (完了ファイル数, 全ファイル数, 完了バイト数,
+                全バイト数) を受け取るコールバック
+
+        Returns:
+            Optional[dict]: 送信結果。"results" に各ファイルの FileUploadResult を含む
+        """
+        try:
+            sizes = [self._file_size(params) for params in files]
+            total_bytes = sum(sizes)
+            progress = {"files": 0, "bytes": 0}
+            progress_lock = threading.Lock()
+
+            cache_keys: List[Optional[str]] = [None] * len(files)
+
+            def upload(index: int) -> FileUploadResult:
+                if self.upload_cache is not None:
+                    cache_keys[index] = self._upload_cache_key(files[index])
+                result = self._upload_file_part(
+                    files[index], sizes[index], cache_keys[index]
+                )
+                with progress_lock:
+                    progress["files"] += 1
+                    progress["bytes"] += sizes[index]
+                    if progress_callback:
+                        progress_callback(
+                            progress["files"],
+                            len(files),
+                            progress["bytes"],
+                            total_bytes,
+                        )
+                return result
+
+            max_workers = max(1, min(slack_settings.upload_concurrency, len(files)))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(upload, range(len(files))))
+
+            # キャッシュ済みのファイルはパーマリンクをメッセージに添える
+            permalinks = [r.permalink for r in results if r.ok and r.cached]
+            comment = "\n".join([text] + permalinks) if text else "\n".join(permalinks)
+
+            uploaded = [
+                (params, result)
+                for params, result in zip(files, results)
+                if result.ok and not result.cached
+            ]
+            if uploaded:
+                response = self.retry_policy.call(
+                    "files.completeUploadExternal",
+                    lambda: self.web_client.files_completeUploadExternal(
+                        files=[
+                            {
+                                "id": result.file_id,
+                                "title": params.title or result.filename,
+                            }
+                            for params, result in uploaded
+                        ],
+                        channel_id=channel_id,
+                        initial_comment=comment,
+                        thread_ts=thread_ts,
+                    ),
+                    max_attempts=1,
+                )
+                completed = {f["id"]: f for f in response.get("files", [])}
+                for index, result in enumerate(results):
+                    if not result.ok or result.cached:
+                        continue
+                    result.permalink = completed.get(result.file_id, {}).get(
+                        "permalink"
+                    )
+                    if cache_keys[index] is not None and result.permalink:
+                        self.upload_cache.put(
+                            cache_keys[index], result.file_id, result.permalink
+                        )
+                ok = response["ok"]
+            elif permalinks:
+                response = self._post_message(
+                    channel_id, text=comment, thread_ts=thread_ts
+                )
+                ok = response["ok"]
+            else:
+                ok = False
+
+            self.logger.info(
+                f"{sum(r.ok for r in results)}/{len(files)} files sent to channel "
+                f"{channel_id}: {text}"
+            )
+            return {
+                "ok": ok,
+                "channel": channel_id,
+                "files": [
+                    {"id": r.file_id, "permalink": r.permalink}
+                    for r in results
+                    if r.ok
+                ],
+                "results": results,
+            }
+        except Exception as e:
+            self.logger.error(f"Error sending message with files: {e}")
+            return None
+
+    def _upload_file_part(
+        self,
+        file_params: FileUploadParams,
+        size: int,
+        cache_key: Optional[str] = None,
+    ) -> FileUploadResult:
+        """
+        1ファイル分をアップロードURLに転送 (共有は files_completeUploadExternal で行う)
+
+        Args:
+            file_params (FileUploadParams): ファイルアップロードに関するパラメータ
+            size (int): ファイルサイズ (バイト)
+            cache_key (Optional[str]): アップロードキャッシュのキー
+
+        Returns:
+            FileUploadResult: 転送結果
+        """
+        filename = self._upload_filename(file_params)
+        result = FileUploadResult(filename=filename, size=size)
+        try:
+            if cache_key is not None:
+                cached = self._find_cached_file(cache_key)
+                if cached:
+                    result.ok = True
+                    result.cached = True
+                    result.file_id = cached["id"]
+                    result.permalink = cached["permalink"]
+                    return result
+
+            upload = self.retry_policy.call(
+                "files.getUploadURLExternal",
+                lambda: self.web_client.files_getUploadURLExternal(
+                    filename=filename,
+                    length=size,
+                    snippet_type=file_params.snippet_type,
+                ),
+            )
+
+            position = (
+                file_params.file.tell()
+                if not isinstance(file_params.file, (str, bytes))
+                else None
+            )
+
+            # 転送が止まったままワーカーを占有しないよう、タイムアウトさせてリトライする
+            # (read はデータの送受信が途切れてからの秒数で、転送全体の上限ではない)
+            timeout = (
+                slack_settings.upload_connect_timeout,
+                slack_settings.upload_read_timeout,
+            )
+
+            def post_file():
+                if isinstance(file_params.file, str):
+                    with open(file_params.file, "rb") as file:
+                        response = self.upload_session.post(
+                            upload["upload_url"], data=file, timeout=timeout
+                        )
+                else:
+                    # リトライ時も同じ位置から送り直す
+                    if position is not None:
+                        file_params.file.seek(position)
+                    response = self.upload_session.post(
+                        upload["upload_url"], data=file_params.file, timeout=timeout
+                    )
+                response.raise_for_status()
+                return response
+
+            self.retry_policy.call("files.upload", post_file)
+
+            result.ok = True
+            result.file_id = upload["file_id"]
+        except Exception as e:
+            self.logger.error(f"Error uploading file {filename}: {e}")
+            result.error = str(e)
+        return result
+
+    def _upload_filename(self, file_params: FileUploadParams) -> str:
+        return file_params.filename or (
+            os.path.basename(file_params.file)
+            if isinstance(file_params.file, str)
+            else "file"
+        )
+
+    def _upload_cache_key(self, file_params: FileUploadParams) -> str:
+        return self.upload_cache.compute_key(
+            file_params.file,
+            filename=self._upload_filename(file_params),
+            title=file_params.title,
+        )
+
+    def _find_cached_file(self, cache_key: str) -> Optional[dict]:
+        """
+        アップロードキャッシュからファイルを取得し、Slack上に残っているかを確認
+
+        Args:
+            cache_key (str): アップロードキャッシュのキー
+
+        Returns:
+            Optional[dict]: キャッシュされたファイル情報 (id, permalink)。
+                キャッシュにない、または削除済みの場合はNone
+        """
+        cached = self.upload_cache.get(cache_key)
+        if not cached or not cached.get("permalink"):
+            return None
+        try:
+            self.retry_policy.call(
+                "files.info", lambda: self.web_client.files_info(file=cached["id"])
+            )
+        except Exception as e:
+            # 別の経路で削除されたファイルはキャッシュから外し、アップロードし直す
+            response = getattr(e, "response", None)
+            if response is not None and response.get("error") in (
+                "file_not_found",
+                "file_deleted",
+            ):
+                self.logger.info(f"Cached file {cached['id']} was deleted")
+                self.upload_cache.remove_file_id(cached["id"])
+            else:
+                self.logger.warning(
+                    f"Failed to check cached file {cached['id']}: {e}"
+                )
+            return None
+        return cached
+
+    def _file_size(self, file_params: FileUploadParams) -> int:
+        file = file_params.file
+        if isinstance(file, str):
+            return os.path.getsize(file)
+        if isinstance(file, bytes):
+            return len(file)
+        # ファイルオブジェクトは現在位置から末尾までを送信する
+        position = file.tell()
+        size = file.seek(0, os.SEEK_END) - position
+        file.seek(position)
+        return size
+
+    def _share_cached_file(
+        self,
+        channel_id: str,
+        text: str,
+        cached: dict,
+        thread_ts: Optional[str] = None,
+    ) -> Optional[dict]:
+        """
+        アップロード済みファイルのパーマリンクをメッセージとして投稿
+
+        Args:
+            channel_id (str): 送信先のチャンネルID
+            text (str): 送信するメッセージ
+            cached (dict): キャッシュされたファイル情報 (id, permalink)
+            thread_ts (Optional[str]): スレッドのタイムスタンプ (スレッドに送信する場合)
+
+        Returns:
+            Optional[dict]: files_upload_v2 と同じく "file" を含む送信結果
+        """
+        response = self._post_message(
+            channel_id,
+            text=f"{text}\n{cached['permalink']}" if text else cached["permalink"],
+            thread_ts=thread_ts,
+            unfurl_links=True,
+            unfurl_media=True,
+        )
+        self.logger.info(
+            f"Cached file {cached['id']} shared to channel {channel_id}: {text}"
+        )
+        return {
+            "ok": response["ok"],
+            "channel": response.get("channel"),
+            "ts": response.get("ts"),
+            "message": response.get("message"),
+            "file": {"id": cached["id"], "permalink": cached["permalink"]},
+            "cached": True,
+        }
+
+    def _post_message(
+        self, channel_id: str, client_msg_id: Optional[str] = None, **kwargs
+    ) -> dict:
+        """
+        chat.postMessage をリトライ付きで呼び出す
+
+        メッセージのメタデータに client_msg_id を埋め込み、再送の前に同じIDの
+        メッセージが既に投稿されていないかを確認することで、二重投稿を防ぐ。
+
+        Args:
+            channel_id (str): 送信先のチャンネルID
+            client_msg_id (Optional[str]): メッセージID (省略時は自動生成)
+            **kwargs: chat.postMessage に渡すパラメータ
+
+        Returns:
+            dict: 送信結果
+        """
+        # 呼び出し側がIDを指定した場合のみ、同じIDの再送を送信済みの結果で返す
+        if client_msg_id is not None:
+            sent = self.sent_messages.get(client_msg_id)
+            if sent is not None:
+                self.logger.info(f"Message {client_msg_id} already sent, skipping")
+                return sent
+        caller_msg_id = client_msg_id
+        client_msg_id = client_msg_id or str(uuid.uuid4())
+
+        kwargs.setdefault("metadata", message_metadata(client_msg_id))
+        started_at = time.time()
+        attempts = 0
+
+        def post():
+            nonlocal attempts
+            attempts += 1
+            if attempts > 1:
+                posted = self._find_posted_message(
+                    channel_id,
+                    client_msg_id,
+                    started_at=started_at,
+                    thread_ts=kwargs.get("thread_ts"),
+                )
+                if posted is not None:
+                    return posted_response(channel_id, posted)
+            return self.web_client.chat_postMessage(channel=channel_id, **kwargs)
+
+        response = self.retry_policy.call("chat.postMessage", post)
+        if caller_msg_id is not None:
+            self.sent_messages.set(caller_msg_id, response)
+        # 返信したスレッドは、停止中に届いた返信もキャッチアップできるよう記録する
+        thread_ts = kwargs.get("thread_ts")
+        if self.checkpoint_store is not None and thread_ts and response.get("ts"):
+            self.checkpoint_store.update_thread(channel_id, thread_ts, response["ts"])
+        return response
+
+    def _update_message(self, channel_id: str, ts: str, text: str) -> dict:
+        """
+        chat.update をリトライ付きで呼び出す
+
+        Args:
+            channel_id (str): チャンネルID
+            ts (str): 更新するメッセージのts
+            text (str): 更新後のテキスト
+
+        Returns:
+            dict: 更新結果
+        """
+        return self.retry_policy.call(
+            "chat.update",
+            lambda: self.web_client.chat_update(channel=channel_id, ts=ts, text=text),
+        )
+
+    def _find_posted_message(
+        self,
+        channel_id: str,
+        client_msg_id: str,
+        started_at: float,
+        thread_ts: Optional[str] = None,
+    ) -> Optional[dict]:
+        """
+        指定したclient_msg_idを持つ投稿済みメッセージを履歴から探す
+
+        Args:
+            channel_id (str): チャンネルID
+            client_msg_id (str): メッセージID
+            started_at (float): 投稿を始めた時刻
+            thread_ts (Optional[str]): スレッドのタイムスタンプ (スレッドへの返信を探す場合)
+
+        Returns:
+            Optional[dict]: 見つかったメッセージ。見つからない場合はNone
+        """
+        method, params = history_request(channel_id, started_at, thread_ts)
+        try:
+            history = getattr(self.web_client, method)(**params)
+        except Exception as e:
+            self.logger.warning(f"Could not check for duplicate message: {e}")
+            return None
+        return find_posted_message(history, client_msg_id)
+
     def delete_file(self, file_id: str) -> Optional[dict]:
         """
         アップロードしたファイルを削除
@@ -233,8 +1127,12 @@ class MessageService:
             Optional[dict]: 削除結果
         """
         try:
-            response = self.web_client.files_delete(file=file_id)
+            response = self.retry_policy.call(
+                "files.delete", lambda: self.web_client.files_delete(file=file_id)
+            )
             self.logger.info(f"File deleted: {file_id}")
+            if self.upload_cache is not None:
+                self.upload_cache.remove_file_id(file_id)
             return response
         except Exception as e:
             self.logger.error(f"Error deleting file: {e}")
@@ -0,0 +1,150 @@
+from typing import Callable, List, Optional
+
+from utils.rate_limiter import RateLimiter
+
+
+class MessageStream:
+    """生成途中のテキストを chat.update で逐次反映しながら投稿する
+
+    最初のテキストが届いた時点で投稿し、以降は rate_limiter の枠が空いたときに
+    chat.update を呼び出す。chat.update はアプリ全体でレート制限されるため、
+    rate_limiter を複数のストリームで共有して呼び出し回数を抑える。
+    1件のメッセージが max_chars を超える場合は、続きをスレッドへの返信として投稿する。
+    """
+
+    def __init__(
+        self,
+        post_message: Callable[..., dict],
+        update_message: Callable[[str, str, str], dict],
+        channel_id: str,
+        thread_ts: Optional[str] = None,
+        max_chars: int = 3900,
+        rate_limiter: Optional[RateLimiter] = None,
+    ):
+        """
+        Args:
+            post_message (Callable[..., dict]): メッセージを投稿する関数
+                (channel_id, text=, thread_ts= を受け取り、ts を含むレスポンスを返す)
+            update_message (Callable[[str, str, str], dict]):
+                メッセージを更新する関数 (channel_id, ts, text を受け取る)
+            channel_id (str): 送信先のチャンネルID
+            thread_ts (Optional[str]): 送信先スレッドのタイムスタンプ (省略時は新規投稿)
+            max_chars (int): 1件のメッセージに含める最大文字数
+            rate_limiter (Optional[RateLimiter]): chat.update の呼び出しを制限する
+                共有のレートリミッター (省略時は1.2秒間隔で制限する)
+        """
+        self.post_message = post_message
+        self.update_message = update_message
+        self.channel_id = channel_id
+        self.thread_ts = thread_ts
+        self.max_chars = max_chars
+        self.rate_limiter = rate_limiter or RateLimiter(1.2)
+
+        self.text = ""
+        self.ts: Optional[str] = None
+        self.messages: List[str] = []
+        self.length = 0
+        self._posted_text = ""
+
+    def append(self, chunk: str):
+        """
+        テキストを追加 (API呼び出しは行わない)
+
+        Args:
+            chunk (str): 追加するテキスト
+        """
+        if chunk:
+            self.text += chunk
+            self.length += len(chunk)
+
+    def needs_flush(self) -> bool:
+        """flush() でAPIを呼び出す必要があるかどうか"""
+        if len(self.text) > self.max_chars:
+            return True
+        if self.ts is None:
+            return bool(self.text.strip())
+        return self.text != self._posted_text and self.rate_limiter.ready()
+
+    def write(self, chunk: str):
+        """
+        テキストを追加し、必要であれば投稿・更新する
+
+        Args:
+            chunk (str): 追加するテキスト
+        """
+        self.append(chunk)
+        if self.needs_flush():
+            self.flush()
+
+    def flush(self, force: bool = False):
+        """
+        現在のテキストを投稿・更新
+
+        Args:
+            force (bool): レート制限の枠が空くまで待機して最新のテキストを反映する
+        """
+        # 上限を超えた分はスレッドへの返信に分割する
+        while len(self.text) > self.max_chars:
+            head, rest = self._split(self.text)
+            self.text = head
+            self._publish(wait=True)
+            self.ts = None
+            self.text = rest
+            self._posted_text = ""
+
+        if self.ts is None:
+            if self.text.strip():
+                self._publish(wait=force)
+        elif force and self.text != self._posted_text:
+            self._publish(wait=True)
+        elif self.text != self._posted_text:
+            self._publish(wait=False)
+
+    def close(self) -> dict:
+        """
+        最新のテキストを反映して送信を完了
+
+        Returns:
+            dict: 送信結果 (最初のメッセージのts と、投稿した全メッセージのts)
+        """
+        self.flush(force=True)
+        return {
+            "ok": bool(self.messages),
+            "channel": self.channel_id,
+            "ts": self.messages[0] if self.messages else None,
+            "thread_ts": self._reply_thread_ts(),
+            "messages": self.messages,
+            "length": self.length,
+        }
+
+    def _publish(self, wait: bool):
+        if self.ts is None:
+            response = self.post_message(
+                self.channel_id, text=self.text, thread_ts=self._reply_thread_ts()
+            )
+            self.ts = response["ts"]
+            self.messages.append(self.ts)
+        elif self.text != self._posted_text:
+            # 他のストリームと合わせてレート制限を超えないよう、空き枠がなければ
+            # 待機する (wait=False の場合は次の flush() に回す)
+            if wait:
+                self.rate_limiter.acquire()
+            elif not self.rate_limiter.try_acquire():
+                return
+            self.update_message(self.channel_id, self.ts, self.text)
+        self._posted_text = self.text
+
+    def _reply_thread_ts(self) -> Optional[str]:
+        # 分割した続きは指定スレッド、なければ最初のメッセージのスレッドに返信する
+        if self.thread_ts:
+            return self.thread_ts
+        return self.messages[0] if self.messages else None
+
+    def _split(self, text: str):
+        """max_chars 以内で、できるだけ改行・空白の位置で分割する"""
+        limit = self.max_chars
+        for separator in ("\n", " "):
+            index = text.rfind(separator, limit // 2, limit)
+            if index != -1:
+                return text[: index + 1], text[index + 1 :]
+        return text[:limit], text[limit:]
@@ -0,0 +1,303 @@
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
+
+from slack_sdk import WebClient
+
+from config.settings import slack_settings
+from utils.ttl_lru_cache import TTLLRUCache
+
+
+class MetadataService:
+    """ユーザー・チャンネル・botのメタデータをキャッシュして解決するサービス
+
+    キャッシュに値があれば期限切れでもその値を返し、更新はバックグラウンドで行う。
+    キャッシュにない場合も既定ではバックグラウンドで取得し、呼び出し元を待たせない。
+    同じIDに対する同時の問い合わせは1回のAPI呼び出しにまとめ、取得に失敗したIDは
+    negative_ttl 秒の間は問い合わせない。
+    """
+
+    def __init__(
+        self,
+        web_client: WebClient,
+        maxsize: Optional[int] = None,
+        ttl: Optional[float] = None,
+        negative_ttl: Optional[float] = None,
+    ):
+        """
+        MetadataServiceの初期化
+
+        Args:
+            web_client (WebClient): SlackのWebClient
+            maxsize (Optional[int]): 種類ごとのキャッシュ上限数 (省略時は設定値)
+            ttl (Optional[float]): キャッシュの有効期限 (秒, 省略時は設定値)
+            negative_ttl (Optional[float]): 取得に失敗したIDを再度問い合わせるまでの秒数
+                (省略時は設定値)
+        """
+        if maxsize is None:
+            maxsize = slack_settings.metadata_cache_maxsize
+        if ttl is None:
+            ttl = slack_settings.metadata_cache_ttl
+        if negative_ttl is None:
+            negative_ttl = slack_settings.metadata_negative_ttl
+
+        self.web_client = web_client
+        self.users = TTLLRUCache(maxsize=maxsize, ttl=ttl)
+        self.channels = TTLLRUCache(maxsize=maxsize, ttl=ttl)
+        self.bots = TTLLRUCache(maxsize=maxsize, ttl=ttl)
+        # 取得に失敗した (kind, ID)
+        self.misses = TTLLRUCache(maxsize=maxsize, ttl=negative_ttl)
+
+        self.logger = logging.getLogger(__name__)
+        self.logger.setLevel(logging.INFO)
+
+        self._inflight: Dict[Tuple[str, str], Future] = {}
+        self._lock = threading.Lock()
+        self._refresh_executor = ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix="metadata-refresh"
+        )
+
+    def preload(
+        self,
+        users: bool = True,
+        channels: bool = True,
+        channel_types: str = "public_channel,private_channel,mpim,im",
+    ):
+        """
+        users.list / conversations.list をページングしながら取得し、キャッシュに格納
+
+        Args:
+            users (bool): ユーザー一覧を取得する
+            channels (bool): チャンネル一覧を取得する
+            channel_types (str): 取得するチャンネルの種類
+        """
+        try:
+            if users:
+                count = 0
+                for page in self._paginate(self.web_client.users_list):
+                    for user in page.get("members", []):
+                        self.users.set(user["id"], user)
+                        count += 1
+                self.logger.info(f"Preloaded {count} users")
+
+            if channels:
+                count = 0
+                for page in self._paginate(
+                    self.web_client.conversations_list,
+                    types=channel_types,
+                    exclude_archived=True,
+                ):
+                    for channel in page.get("channels", []):
+                        self.channels.set(channel["id"], channel)
+                        count += 1
+                self.logger.info(f"Preloaded {count} channels")
+        except Exception as e:
+            self.logger.error(f"Error preloading metadata: {e}")
+
+    def get_user(self, user_id: str, fetch: bool = False) -> Optional[dict]:
+        """
+        ユーザー情報を取得
+
+        Args:
+            user_id (str): ユーザーID
+            fetch (bool): キャッシュにない場合にAPIからの取得を待つ
+                (Falseの場合はバックグラウンドで取得し、Noneを返す)
+
+        Returns:
+            Optional[dict]: users.info の user オブジェクト
+        """
+        return self._resolve("user", self.users, user_id, self._fetch_user, fetch)
+
+    def get_channel(self, channel_id: str, fetch: bool = False) -> Optional[dict]:
+        """
+        チャンネル情報を取得
+
+        Args:
+            channel_id (str): チャンネルID
+            fetch (bool): キャッシュにない場合にAPIからの取得を待つ
+                (Falseの場合はバックグラウンドで取得し、Noneを返す)
+
+        Returns:
+            Optional[dict]: conversations.info の channel オブジェクト
+        """
+        return self._resolve(
+            "channel", self.channels, channel_id, self._fetch_channel, fetch
+        )
+
+    def get_bot(self, bot_id: str, fetch: bool = False) -> Optional[dict]:
+        """
+        bot情報を取得
+
+        Args:
+            bot_id (str): botID (B から始まるID)
+            fetch (bool): キャッシュにない場合にAPIからの取得を待つ
+                (Falseの場合はバックグラウンドで取得し、Noneを返す)
+
+        Returns:
+            Optional[dict]: bots.info の bot オブジェクト
+        """
+        return self._resolve("bot", self.bots, bot_id, self._fetch_bot, fetch)
+
+    def get_display_name(self, user_id: str, fetch: bool = False) -> Optional[str]:
+        """ユーザーの表示名を取得 (表示名 > 氏名 > ユーザー名の順)"""
+        user = self.get_user(user_id, fetch=fetch)
+        if not user:
+            return None
+        profile = user.get("profile") or {}
+        return (
+            profile.get("display_name")
+            or profile.get("real_name")
+            or user.get("real_name")
+            or user.get("name")
+        )
+
+    def get_timezone(self, user_id: str, fetch: bool = False) -> Optional[str]:
+        """ユーザーのタイムゾーン (例: "Asia/Tokyo") を取得"""
+        user = self.get_user(user_id, fetch=fetch)
+        return user.get("tz") if user else None
+
+    def get_channel_name(self, channel_id: str, fetch: bool = False) -> Optional[str]:
+        """チャンネル名を取得"""
+        channel = self.get_channel(channel_id, fetch=fetch)
+        return channel.get("name") if channel else None
+
+    def handle_event(self, event_data: dict):
+        """
+        メタデータの変更イベントを受けてキャッシュを更新
+
+        Args:
+            event_data (dict): Slackイベントデータ
+        """
+        event_type = event_data.get("type")
+
+        if event_type in ("user_change", "team_join"):
+            user = event_data.get("user") or {}
+            if user.get("id"):
+                self.users.set(user["id"], user)
+                self.misses.invalidate(("user", user["id"]))
+
+        elif event_type in ("channel_rename", "group_rename"):
+            renamed = event_data.get("channel") or {}
+            channel_id = renamed.get("id")
+            if not channel_id:
+                return
+            cached, _ = self.channels.get_entry(channel_id)
+            if cached is not None:
+                self.channels.set(channel_id, dict(cached, name=renamed.get("name")))
+            else:
+                self.channels.invalidate(channel_id)
+            self.misses.invalidate(("channel", channel_id))
+
+        elif event_type in (
+            "channel_archive",
+            "channel_unarchive",
+            "channel_deleted",
+            "group_archive",
+            "group_unarchive",
+            "group_deleted",
+        ):
+            channel_id = event_data.get("channel")
+            if isinstance(channel_id, str):
+                self.channels.invalidate(channel_id)
+                self.misses.invalidate(("channel", channel_id))
+
+        elif event_type == "bot_changed":
+            bot = event_data.get("bot") or {}
+            if bot.get("id"):
+                self.bots.set(bot["id"], bot)
+                self.misses.invalidate(("bot", bot["id"]))
+
+    def _resolve(
+        self,
+        kind: str,
+        cache: TTLLRUCache,
+        key: str,
+        loader: Callable[[str], dict],
+        fetch: bool,
+    ) -> Optional[dict]:
+        value, fresh = cache.get_entry(key)
+        if value is not None:
+            if not fresh:
+                # 古い値を返しつつバックグラウンドで更新する
+                self._load_in_background(kind, cache, key, loader)
+            return value
+        if self.misses.get((kind, key)) is not None:
+            return None
+        if not fetch:
+            self._load_in_background(kind, cache, key, loader)
+            return None
+        return self._load(kind, cache, key, loader)
+
+    def _load_in_background(
+        self, kind: str, cache: TTLLRUCache, key: str, loader: Callable[[str], dict]
+    ):
+        # 投入前に Future を登録し、同時に取りこぼしたスレッドの取得を1回にまとめる
+        with self._lock:
+            if (kind, key) in self._inflight:
+                return
+            future = Future()
+            self._inflight[(kind, key)] = future
+        self._refresh_executor.submit(
+            self._fetch_into, future, kind, cache, key, loader
+        )
+
+    def _load(
+        self, kind: str, cache: TTLLRUCache, key: str, loader: Callable[[str], dict]
+    ) -> Optional[dict]:
+        # 同じIDへの同時リクエストは先行するリクエストの結果を待つ
+        with self._lock:
+            future = self._inflight.get((kind, key))
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[(kind, key)] = future
+        if owner:
+            self._fetch_into(future, kind, cache, key, loader)
+        return future.result()
+
+    def _fetch_into(
+        self,
+        future: Future,
+        kind: str,
+        cache: TTLLRUCache,
+        key: str,
+        loader: Callable[[str], dict],
+    ):
+        try:
+            # 先行する取得が直前に完了していれば、APIを呼び出さずにその結果を使う
+            value, fresh = cache.get_entry(key)
+            if not fresh:
+                if self.misses.get((kind, key)) is not None:
+                    value = None
+                else:
+                    value = loader(key)
+                    cache.set(key, value)
+                    self.misses.invalidate((kind, key))
+            future.set_result(value)
+        except Exception as e:
+            self.logger.error(f"Error fetching {kind} {key}: {e}")
+            # 存在しないIDなどで毎回APIを呼び出さないよう、失敗も一定時間キャッシュする
+            self.misses.set((kind, key), True)
+            future.set_result(None)
+        finally:
+            with self._lock:
+                del self._inflight[(kind, key)]
+
+    def _fetch_user(self, user_id: str) -> dict:
+        return self.web_client.users_info(user=user_id)["user"]
+
+    def _fetch_channel(self, channel_id: str) -> dict:
+        return self.web_client.conversations_info(channel=channel_id)["channel"]
+
+    def _fetch_bot(self, bot_id: str) -> dict:
+        return self.web_client.bots_info(bot=bot_id)["bot"]
+
+    def _paginate(self, method: Callable, **kwargs):
+        cursor = None
+        while True:
+            page = method(limit=200, cursor=cursor, **kwargs)
+            yield page
+            cursor = (page.get("response_metadata") or {}).get("next_cursor")
+            if not cursor:
+                break
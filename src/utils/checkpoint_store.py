@@ -0,0 +1,166 @@
+"""
+Per-channel and per-thread high-water marks of processed messages
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+class CheckpointStore:
+    """チャンネル・スレッドごとに最後に処理したメッセージのタイムスタンプを永続化する
+
+    スレッドへの返信は conversations.history に含まれないため、返信のあったスレッドを
+    別に記録する。最後の返信から thread_ttl 秒を過ぎたスレッドは記録から外し、
+    記録するスレッド数は max_threads 件までとする。
+    書き込みは flush_interval 秒ごとにまとめて行い、flush() で即時に保存できる。
+    """
+
+    def __init__(
+        self,
+        path: str,
+        flush_interval: float = 1.0,
+        thread_ttl: float = 7 * 24 * 3600.0,
+        max_threads: int = 1000,
+    ):
+        """
+        Args:
+            path (str): チェックポイントを保存するJSONファイルのパス
+            flush_interval (float): ディスクへ書き出す最小間隔 (秒)
+            thread_ttl (float): スレッドを記録しておく期間 (最後の返信からの秒数)
+            max_threads (int): 記録するスレッド数の上限
+        """
+        self.path = path
+        self.flush_interval = flush_interval
+        self.thread_ttl = thread_ttl
+        self.max_threads = max_threads
+        self.checkpoints: Dict[str, str] = {}
+        # "<チャンネルID>:<スレッドのts>" -> 最後に処理した返信のts
+        self.thread_checkpoints: Dict[str, str] = {}
+        self._dirty = False
+        self._last_flush = 0.0
+        self._lock = threading.Lock()
+        self._load()
+
+    def get(self, channel_id: str) -> Optional[str]:
+        """
+        チャンネルのチェックポイントを取得
+
+        Args:
+            channel_id (str): チャンネルID
+
+        Returns:
+            Optional[str]: 最後に処理したメッセージのts。未登録の場合はNone
+        """
+        with self._lock:
+            return self.checkpoints.get(channel_id)
+
+    def channels(self) -> list:
+        """
+        チェックポイントが存在するチャンネルの一覧を取得
+
+        Returns:
+            list: チャンネルIDのリスト
+        """
+        with self._lock:
+            return list(self.checkpoints)
+
+    def threads(self) -> List[Tuple[str, str, str]]:
+        """
+        記録しているスレッドの一覧を取得
+
+        Returns:
+            List[Tuple[str, str, str]]: (チャンネルID, スレッドのts, 最後に処理した返信のts)
+        """
+        with self._lock:
+            return [
+                tuple(key.split(":", 1)) + (ts,)
+                for key, ts in self.thread_checkpoints.items()
+            ]
+
+    def update_thread(self, channel_id: str, thread_ts: str, ts: str):
+        """
+        スレッドのチェックポイントを更新。既存の値より新しい場合のみ反映する
+
+        Args:
+            channel_id (str): チャンネルID
+            thread_ts (str): スレッドの親メッセージのts
+            ts (str): 処理した返信のts
+        """
+        key = f"{channel_id}:{thread_ts}"
+        with self._lock:
+            current = self.thread_checkpoints.get(key)
+            if current is not None and float(current) >= float(ts):
+                return
+            self.thread_checkpoints[key] = ts
+            self._dirty = True
+            if time.monotonic() - self._last_flush >= self.flush_interval:
+                self._save()
+
+    def update(self, channel_id: str, ts: str):
+        """
+        チェックポイントを更新。既存の値より新しい場合のみ反映する
+
+        Args:
+            channel_id (str): チャンネルID
+            ts (str): 処理したメッセージのts
+        """
+        with self._lock:
+            current = self.checkpoints.get(channel_id)
+            if current is not None and float(current) >= float(ts):
+                return
+            self.checkpoints[channel_id] = ts
+            self._dirty = True
+            if time.monotonic() - self._last_flush >= self.flush_interval:
+                self._save()
+
+    def flush(self):
+        """未保存のチェックポイントをディスクに書き出す"""
+        with self._lock:
+            if self._dirty:
+                self._save()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if "channels" in data:
+            self.checkpoints = data["channels"]
+            self.thread_checkpoints = data.get("threads", {})
+        else:
+            # スレッドを記録する前の形式 (チャンネルID -> ts)
+            self.checkpoints = data
+
+    def _save(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        self._prune_threads()
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"channels": self.checkpoints, "threads": self.thread_checkpoints}, f
+            )
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+        self._last_flush = time.monotonic()
+
+    def _prune_threads(self):
+        # 返信の途絶えたスレッドと、上限を超えた古いスレッドは追跡しない
+        expires = time.time() - self.thread_ttl
+        threads = sorted(
+            (
+                (key, ts)
+                for key, ts in self.thread_checkpoints.items()
+                if float(ts) >= expires
+            ),
+            key=lambda item: float(item[1]),
+        )
+        if len(threads) > self.max_threads:
+            threads = threads[len(threads) - self.max_threads :]
+        self.thread_checkpoints = dict(threads)
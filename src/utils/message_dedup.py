@@ -0,0 +1,77 @@
+"""
+Duplicate detection for retried chat.postMessage calls, shared by the sync and async clients
+"""
+
+from typing import Optional, Tuple
+
+# 投稿時にメタデータとして埋め込むイベントタイプ
+MESSAGE_EVENT_TYPE = "assistant_bot_message"
+
+# ローカルの時計が Slack より進んでいても投稿済みのメッセージを見逃さないよう、
+# 投稿を始めた時刻よりこの秒数だけ前から履歴を検索する
+CLOCK_SKEW_MARGIN = 60.0
+
+
+def message_metadata(client_msg_id: str) -> dict:
+    """
+    client_msg_id を埋め込んだメッセージのメタデータを作成
+
+    Args:
+        client_msg_id (str): メッセージID
+
+    Returns:
+        dict: chat.postMessage の metadata パラメータ
+    """
+    return {
+        "event_type": MESSAGE_EVENT_TYPE,
+        "event_payload": {"client_msg_id": client_msg_id},
+    }
+
+
+def history_request(
+    channel_id: str, started_at: float, thread_ts: Optional[str] = None
+) -> Tuple[str, dict]:
+    """
+    投稿済みのメッセージを探すためのAPIメソッドとパラメータを作成
+
+    Args:
+        channel_id (str): チャンネルID
+        started_at (float): 投稿を始めた時刻 (ローカルの時計)
+        thread_ts (Optional[str]): スレッドのタイムスタンプ (スレッドへの返信を探す場合)
+
+    Returns:
+        Tuple[str, dict]: WebClient のメソッド名と引数
+    """
+    params = {
+        "channel": channel_id,
+        "oldest": f"{started_at - CLOCK_SKEW_MARGIN:.6f}",
+        "include_all_metadata": True,
+        "limit": 100,
+    }
+    # スレッドへの返信は conversations.history には含まれない
+    if thread_ts:
+        return "conversations_replies", dict(params, ts=thread_ts)
+    return "conversations_history", params
+
+
+def find_posted_message(history: dict, client_msg_id: str) -> Optional[dict]:
+    """
+    履歴から指定した client_msg_id を持つメッセージを探す
+
+    Args:
+        history (dict): conversations.history / conversations.replies のレスポンス
+        client_msg_id (str): メッセージID
+
+    Returns:
+        Optional[dict]: 見つかったメッセージ。見つからない場合はNone
+    """
+    for message in history.get("messages", []):
+        payload = (message.get("metadata") or {}).get("event_payload") or {}
+        if payload.get("client_msg_id") == client_msg_id:
+            return message
+    return None
+
+
+def posted_response(channel_id: str, message: dict) -> dict:
+    """見つかったメッセージを chat.postMessage のレスポンスと同じ形にする"""
+    return {"ok": True, "channel": channel_id, "ts": message["ts"], "message": message}
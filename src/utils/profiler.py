@@ -0,0 +1,328 @@
+"""
+Runtime profiling hooks for message handlers and the dispatch path
+"""
+
+import cProfile
+import json
+import logging
+import os
+import random
+import signal
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+PROFILE_MODES = ("cprofile", "sampling")
+
+
+class HandlerProfiler:
+    """ハンドラとディスパッチ処理のプロファイラ
+
+    実行中に enable() / disable() (またはシグナル) で切り替えられる。
+    呼び出し側は enabled を確認してから section() / call_handler() を使うため、
+    無効時のオーバーヘッドはない。
+
+    - cprofile: ハンドラごとに cProfile を取り、pstats 形式 (.prof) で出力
+    - sampling: 一定間隔でスタックをサンプリングし、speedscope 形式 (.speedscope.json) で出力
+    - trace_memory: tracemalloc のスナップショットを一定間隔で取り、前回との差分を出力
+    - slow_threshold: この秒数を超えたハンドラ・処理を警告としてログに出力
+    """
+
+    def __init__(
+        self,
+        output_dir: str = "profiles",
+        mode: str = "cprofile",
+        sample_rate: float = 1.0,
+        sampling_interval: float = 0.005,
+        slow_threshold: Optional[float] = 1.0,
+        trace_memory: bool = False,
+        memory_interval: float = 60.0,
+    ):
+        """
+        Args:
+            output_dir (str): プロファイル結果の出力先ディレクトリ
+            mode (str): "cprofile" または "sampling"
+            sample_rate (float): cprofile モードでプロファイルを取る呼び出しの割合
+            sampling_interval (float): sampling モードのサンプリング間隔 (秒)
+            slow_threshold (Optional[float]): 遅延とみなす秒数 (Noneで無効)
+            trace_memory (bool): tracemalloc によるメモリの差分を出力する
+            memory_interval (float): メモリスナップショットを取る間隔 (秒)
+        """
+        self.output_dir = output_dir
+        self.mode = mode
+        self.sample_rate = sample_rate
+        self.sampling_interval = sampling_interval
+        self.slow_threshold = slow_threshold
+        self.trace_memory = trace_memory
+        self.memory_interval = memory_interval
+        self.enabled = False
+
+        self.logger = logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        self._profiles: Dict[str, cProfile.Profile] = {}
+        # cProfile は同時に1つしか有効にできないため、プロファイルは1件ずつ取る
+        self._cprofile_lock = threading.Lock()
+        # スレッドごとに実行中のセクション名のスタック (sampling モードで使用)
+        self._active: Dict[int, List[str]] = {}
+        self._frames: List[dict] = []
+        self._frame_index: Dict[tuple, int] = {}
+        self._samples: Dict[str, List[List[int]]] = {}
+        self._snapshot = None
+        self._worker: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    def enable(self):
+        """
+        プロファイルを開始
+
+        Raises:
+            ValueError: mode が不正な場合
+        """
+        # 無効のまま使う場合は mode を参照しないため、有効化するときに検証する
+        if self.mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode: {self.mode}")
+        with self._lock:
+            if self.enabled:
+                return
+            self.enabled = True
+            self._stop_event.clear()
+            if self.trace_memory and not tracemalloc.is_tracing():
+                tracemalloc.start()
+            if self.mode == "sampling" or self.trace_memory:
+                self._worker = threading.Thread(
+                    target=self._run_worker, name="handler-profiler", daemon=True
+                )
+                self._worker.start()
+        self.logger.info(f"Profiler enabled (mode={self.mode})")
+
+    def disable(self) -> List[str]:
+        """
+        プロファイルを停止し、結果をファイルに出力
+
+        Returns:
+            List[str]: 出力したファイルのパス
+        """
+        with self._lock:
+            if not self.enabled:
+                return []
+            self.enabled = False
+            self._stop_event.set()
+            worker = self._worker
+            self._worker = None
+        if worker is not None:
+            worker.join()
+
+        paths = self.dump()
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+            self._snapshot = None
+        self.logger.info("Profiler disabled")
+        return paths
+
+    def toggle(self):
+        """有効・無効を切り替える"""
+        if self.enabled:
+            self.disable()
+        else:
+            self.enable()
+
+    def install_signal_handler(self, signum: int = signal.SIGUSR1):
+        """
+        シグナルでプロファイルの有効・無効を切り替えられるようにする (メインスレッドから呼ぶ)
+
+        Args:
+            signum (int): 切り替えに使うシグナル (デフォルト: SIGUSR1)
+        """
+        # disable() はスレッドの終了待ち・ファイル出力・ロックの取得を行うため、
+        # シグナルハンドラ内で直接実行するとデッドロックする可能性がある
+        signal.signal(
+            signum,
+            lambda signum, frame: threading.Thread(
+                target=self.toggle, name="handler-profiler-toggle"
+            ).start(),
+        )
+
+    @contextmanager
+    def section(self, name: str):
+        """
+        処理区間の所要時間を計測し、sampling モードではサンプルをこの区間に帰属させる
+
+        Args:
+            name (str): 区間の名前
+        """
+        ident = threading.get_ident()
+        stack = self._active.setdefault(ident, [])
+        stack.append(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            stack.pop()
+            if not stack:
+                self._active.pop(ident, None)
+            if self.slow_threshold is not None and elapsed > self.slow_threshold:
+                self.logger.warning(
+                    f"Slow {name}: {elapsed * 1000:.1f}ms "
+                    f"(threshold {self.slow_threshold * 1000:.0f}ms)"
+                )
+
+    def call_handler(self, handler: Callable, *args, **kwargs):
+        """
+        ハンドラをプロファイルしながら実行
+
+        Args:
+            handler (Callable): 実行するハンドラ
+            *args: ハンドラに渡す引数
+            **kwargs: ハンドラに渡すキーワード引数
+
+        Returns:
+            ハンドラの戻り値
+        """
+        name = getattr(handler, "__qualname__", None) or repr(handler)
+        with self.section(name):
+            if self.mode != "cprofile" or random.random() >= self.sample_rate:
+                return handler(*args, **kwargs)
+
+            # 別スレッドでプロファイル中の場合はそのまま実行する
+            if not self._cprofile_lock.acquire(blocking=False):
+                return handler(*args, **kwargs)
+            try:
+                return self._get_profile(name).runcall(handler, *args, **kwargs)
+            finally:
+                self._cprofile_lock.release()
+
+    def dump(self) -> List[str]:
+        """
+        これまでの結果をファイルに出力し、集計をリセット
+
+        Returns:
+            List[str]: 出力したファイルのパス
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        timestamp = time.strftime("%Y%m%d-%H%M%S")
+        paths = []
+
+        # 計測中のプロファイルを書き出さないよう、実行中のハンドラの終了を待つ
+        with self._cprofile_lock, self._lock:
+            profiles, self._profiles = self._profiles, {}
+            samples, self._samples = self._samples, {}
+            frames = self._frames
+            self._frames, self._frame_index = [], {}
+
+        for name, profile in profiles.items():
+            path = os.path.join(
+                self.output_dir, f"{self._safe_name(name)}-{timestamp}.prof"
+            )
+            profile.dump_stats(path)
+            paths.append(path)
+
+        if samples:
+            path = os.path.join(
+                self.output_dir, f"sampling-{timestamp}.speedscope.json"
+            )
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self._speedscope(frames, samples), f)
+            paths.append(path)
+
+        if self.trace_memory and tracemalloc.is_tracing():
+            paths.append(self._write_memory_diff())
+
+        for path in paths:
+            self.logger.info(f"Profile written: {path}")
+        return paths
+
+    def _get_profile(self, name: str) -> cProfile.Profile:
+        with self._lock:
+            if name not in self._profiles:
+                self._profiles[name] = cProfile.Profile()
+            return self._profiles[name]
+
+    def _run_worker(self):
+        last_snapshot = time.monotonic()
+        interval = self.sampling_interval if self.mode == "sampling" else 1.0
+        while not self._stop_event.wait(interval):
+            # 一時的なエラーでサンプリングが止まらないよう、ログに出して続ける
+            try:
+                if self.mode == "sampling":
+                    self._sample_stacks()
+                if self.trace_memory and time.monotonic() - last_snapshot >= (
+                    self.memory_interval
+                ):
+                    last_snapshot = time.monotonic()
+                    self._write_memory_diff()
+            except Exception:
+                self.logger.exception("Profiler worker failed")
+
+    def _sample_stacks(self):
+        frames = sys._current_frames()
+        for ident, sections in list(self._active.items()):
+            # 対象スレッドが並行して push / pop するため、コピーしてから参照する
+            current = list(sections)
+            frame = frames.get(ident)
+            if frame is None or not current:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(
+                    self._frame_id(code.co_name, code.co_filename, code.co_firstlineno)
+                )
+                frame = frame.f_back
+            stack.reverse()
+            with self._lock:
+                self._samples.setdefault(current[-1], []).append(stack)
+
+    def _frame_id(self, name: str, filename: str, line: int) -> int:
+        key = (name, filename, line)
+        with self._lock:
+            index = self._frame_index.get(key)
+            if index is None:
+                index = len(self._frames)
+                self._frames.append({"name": name, "file": filename, "line": line})
+                self._frame_index[key] = index
+            return index
+
+    def _speedscope(self, frames: List[dict], samples: Dict[str, list]) -> dict:
+        profiles = []
+        for name, stacks in samples.items():
+            profiles.append(
+                {
+                    "type": "sampled",
+                    "name": name,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": len(stacks) * self.sampling_interval,
+                    "samples": stacks,
+                    "weights": [self.sampling_interval] * len(stacks),
+                }
+            )
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": frames},
+            "profiles": profiles,
+            "exporter": "slack-assistant-bot-client",
+        }
+
+    def _write_memory_diff(self) -> str:
+        snapshot = tracemalloc.take_snapshot()
+        if self._snapshot is None:
+            stats = snapshot.statistics("lineno")
+        else:
+            stats = snapshot.compare_to(self._snapshot, "lineno")
+        self._snapshot = snapshot
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        timestamp = time.strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(self.output_dir, f"memory-{timestamp}.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            for stat in stats[:50]:
+                f.write(f"{stat}\n")
+        return path
+
+    def _safe_name(self, name: str) -> str:
+        return "".join(c if c.isalnum() or c in "-_." else "_" for c in name)
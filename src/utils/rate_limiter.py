@@ -0,0 +1,40 @@
+import threading
+import time
+
+
+class RateLimiter:
+    """呼び出しの間隔を一定以上に保つレートリミッター
+
+    複数のスレッド・ストリームで共有し、アプリ全体での呼び出し回数を制限する。
+    """
+
+    def __init__(self, interval: float):
+        """
+        Args:
+            interval (float): 呼び出しの最小間隔 (秒)
+        """
+        self.interval = interval
+        self._next_at = 0.0
+        self._lock = threading.Lock()
+
+    def ready(self) -> bool:
+        """待たずに呼び出せるかどうか (枠は確保しない)"""
+        return time.monotonic() >= self._next_at
+
+    def try_acquire(self) -> bool:
+        """待たずに呼び出せる場合のみ枠を確保する"""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._next_at:
+                return False
+            self._next_at = now + self.interval
+            return True
+
+    def acquire(self):
+        """枠が空くまで待機して確保する"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_at)
+            self._next_at = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
@@ -0,0 +1,298 @@
+"""
+Retry policy with jittered backoff, retry budgets and per-endpoint circuit breakers
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from collections import deque
+from http.client import HTTPException
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+from urllib.error import URLError
+
+from requests.exceptions import ConnectionError as RequestsConnectionError
+from requests.exceptions import Timeout as RequestsTimeout
+
+from config.settings import slack_settings
+
+try:
+    from aiohttp import ClientError as AiohttpClientError
+except ImportError:  # pragma: no cover
+    AiohttpClientError = ()
+
+T = TypeVar("T")
+
+# 一時的な障害とみなすSlack APIのエラーコード
+RETRYABLE_SLACK_ERRORS = {
+    "ratelimited",
+    "internal_error",
+    "fatal_error",
+    "service_unavailable",
+    "request_timeout",
+}
+
+TRANSIENT_EXCEPTIONS = (
+    ConnectionError,
+    TimeoutError,
+    URLError,
+    HTTPException,
+    asyncio.TimeoutError,
+    RequestsConnectionError,
+    RequestsTimeout,
+) + ((AiohttpClientError,) if AiohttpClientError else ())
+
+
+class CircuitOpenError(Exception):
+    """サーキットブレーカーが開いており、呼び出しを行わなかった場合の例外"""
+
+
+class CircuitBreaker:
+    """エンドポイントごとのサーキットブレーカー
+
+    連続して failure_threshold 回失敗すると開き、reset_timeout 秒経過するまで
+    呼び出しを即座に失敗させる。経過後は1回だけ試行を許可し、成功すれば閉じる。
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            elapsed = time.monotonic() - self.opened_at
+            if elapsed >= self.reset_timeout and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+class RetryPolicy:
+    """同期・非同期クライアントで共有するリトライポリシー
+
+    一時的な障害 (ネットワークエラー、5xx、レート制限) のみを指数バックオフ
+    (フルジッター) でリトライする。メソッドごとに一定時間内のリトライ回数の上限
+    (リトライバジェット) を設け、障害時にリトライが殺到しないようにする。
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        method_attempts: Optional[Dict[str, int]] = None,
+        retry_budget: int = 20,
+        budget_window: float = 60.0,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+    ):
+        """
+        Args:
+            max_attempts (int): 1回の呼び出しあたりの最大試行回数
+            base_delay (float): バックオフの基準となる待機時間 (秒)
+            max_delay (float): 待機時間の上限 (秒)
+            method_attempts (Optional[Dict[str, int]]): メソッドごとの最大試行回数
+            retry_budget (int): メソッドごとに budget_window 秒間に許可するリトライ回数
+            budget_window (float): リトライバジェットの集計期間 (秒)
+            failure_threshold (int): サーキットブレーカーが開くまでの連続失敗回数
+            reset_timeout (float): サーキットブレーカーが再試行を許可するまでの秒数
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.method_attempts = method_attempts or {}
+        self.retry_budget = retry_budget
+        self.budget_window = budget_window
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self._retries: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    @classmethod
+    def from_settings(cls) -> "RetryPolicy":
+        """
+        SLACK_RETRY_* / SLACK_CIRCUIT_* の設定値からリトライポリシーを作成
+
+        Returns:
+            RetryPolicy: 作成したリトライポリシー
+        """
+        return cls(
+            max_attempts=slack_settings.retry_max_attempts,
+            base_delay=slack_settings.retry_base_delay,
+            max_delay=slack_settings.retry_max_delay,
+            retry_budget=slack_settings.retry_budget,
+            failure_threshold=slack_settings.circuit_failure_threshold,
+            reset_timeout=slack_settings.circuit_reset_timeout,
+        )
+
+    def call(
+        self, method: str, func: Callable[[], T], max_attempts: Optional[int] = None
+    ) -> T:
+        """
+        リトライ付きで関数を呼び出す
+
+        Args:
+            method (str): APIメソッド名 (例: "chat.postMessage")
+            func (Callable[[], T]): 呼び出す関数
+            max_attempts (Optional[int]): 最大試行回数 (省略時はポリシーの設定値)
+
+        Returns:
+            T: 関数の戻り値
+
+        Raises:
+            CircuitOpenError: サーキットブレーカーが開いている場合
+        """
+        attempt = 0
+        while True:
+            attempt += 1
+            self._check_circuit(method)
+            try:
+                result = func()
+            except Exception as e:
+                delay = self._on_failure(method, attempt, e, max_attempts)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                continue
+            self.breaker(method).record_success()
+            return result
+
+    async def acall(
+        self,
+        method: str,
+        func: Callable[[], Awaitable[T]],
+        max_attempts: Optional[int] = None,
+    ) -> T:
+        """
+        call() の非同期版
+
+        Args:
+            method (str): APIメソッド名 (例: "chat.postMessage")
+            func (Callable[[], Awaitable[T]]): 呼び出すコルーチン関数
+            max_attempts (Optional[int]): 最大試行回数 (省略時はポリシーの設定値)
+
+        Returns:
+            T: コルーチンの戻り値
+        """
+        attempt = 0
+        while True:
+            attempt += 1
+            self._check_circuit(method)
+            try:
+                result = await func()
+            except Exception as e:
+                delay = self._on_failure(method, attempt, e, max_attempts)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            self.breaker(method).record_success()
+            return result
+
+    def breaker(self, method: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self.breakers.get(method)
+            if breaker is None:
+                breaker = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+                self.breakers[method] = breaker
+            return breaker
+
+    def is_retryable(self, error: Exception) -> bool:
+        if isinstance(error, TRANSIENT_EXCEPTIONS):
+            return True
+        # SlackApiError は response に HTTPステータスとエラーコードを持つ
+        response = getattr(error, "response", None)
+        if response is None:
+            return False
+        status_code = getattr(response, "status_code", None)
+        if status_code is not None and (status_code == 429 or status_code >= 500):
+            return True
+        try:
+            return response.get("error") in RETRYABLE_SLACK_ERRORS
+        except Exception:
+            return False
+
+    def retry_delay(self, attempt: int, error: Optional[Exception] = None) -> float:
+        # レート制限の場合は Retry-After に従う
+        response = getattr(error, "response", None)
+        headers = getattr(response, "headers", None) or {}
+        retry_after = headers.get("Retry-After") or headers.get("retry-after")
+        if retry_after:
+            try:
+                return min(float(retry_after), self.max_delay)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+    def _check_circuit(self, method: str):
+        if not self.breaker(method).allow():
+            raise CircuitOpenError(f"Circuit open for {method}")
+
+    def _on_failure(
+        self,
+        method: str,
+        attempt: int,
+        error: Exception,
+        max_attempts: Optional[int],
+    ) -> Optional[float]:
+        """失敗を記録し、リトライする場合は待機時間を、しない場合はNoneを返す"""
+        breaker = self.breaker(method)
+        if not self.is_retryable(error):
+            # エンドポイント自体は応答しているので障害とはみなさない
+            breaker.record_success()
+            return None
+
+        breaker.record_failure()
+        max_attempts = max_attempts or self.method_attempts.get(
+            method, self.max_attempts
+        )
+        if attempt >= max_attempts or breaker.is_open:
+            return None
+        if not self._consume_budget(method):
+            self.logger.warning(f"Retry budget exhausted for {method}")
+            return None
+
+        delay = self.retry_delay(attempt, error)
+        self.logger.warning(
+            f"Retrying {method} in {delay:.2f}s "
+            f"(attempt {attempt}/{max_attempts}): {error}"
+        )
+        return delay
+
+    def _consume_budget(self, method: str) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            retries = self._retries.setdefault(method, deque())
+            while retries and now - retries[0] > self.budget_window:
+                retries.popleft()
+            if len(retries) >= self.retry_budget:
+                return False
+            retries.append(now)
+            return True
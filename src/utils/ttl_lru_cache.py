@@ -0,0 +1,52 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+
+class TTLLRUCache:
+    """有効期限付きのLRUキャッシュ
+
+    期限切れのエントリも削除されるまで保持し、get_entry() で古い値として参照できる。
+    """
+
+    def __init__(self, maxsize: int = 1000, ttl: float = 3600.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.items: "OrderedDict[Any, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        value, fresh = self.get_entry(key)
+        return value if fresh else default
+
+    def get_entry(self, key) -> Tuple[Optional[Any], bool]:
+        """値と有効期限内かどうかを返す。存在しない場合は (None, False)"""
+        with self._lock:
+            entry = self.items.get(key)
+            if entry is None:
+                return None, False
+            self.items.move_to_end(key)
+            value, expires_at = entry
+            return value, time.monotonic() < expires_at
+
+    def set(self, key, value):
+        with self._lock:
+            self.items[key] = (value, time.monotonic() + self.ttl)
+            self.items.move_to_end(key)
+            while len(self.items) > self.maxsize:
+                self.items.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self.items.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self.items.clear()
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __len__(self):
+        return len(self.items)
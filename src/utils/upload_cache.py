@@ -0,0 +1,259 @@
+"""
+Content-addressed cache of uploaded Slack files
+"""
+
+import atexit
+import fcntl
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from io import IOBase
+from typing import Optional, Union
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class UploadCache:
+    """アップロード済みファイルをコンテンツハッシュで管理するLRUキャッシュ
+
+    キャッシュはJSONファイルとしてディスクに保存され、プロセスを跨いで再利用される。
+    書き込み時はファイルをロックしてディスク上の内容を読み直し、他のプロセスでの
+    追加・削除を反映してから保存する。参照時刻も (touch_interval 秒に1回、
+    および終了時に) 保存し、プロセスを跨いで最近使われていないエントリから追い出す。
+    パス指定のファイルは (サイズ, 更新時刻) が前回と一致すればハッシュ計算を省略する。
+    """
+
+    def __init__(self, path: str, maxsize: int = 1000, touch_interval: float = 5.0):
+        """
+        Args:
+            path (str): キャッシュを保存するJSONファイルのパス
+            maxsize (int): 保持するエントリの上限数
+            touch_interval (float): 参照時刻をディスクに保存する最小間隔 (秒)
+        """
+        self.path = path
+        self.maxsize = maxsize
+        self.entries: "OrderedDict[str, dict]" = OrderedDict()
+        self.stats: dict = {}
+        self.touch_interval = touch_interval
+        self._mtime_ns: Optional[int] = None
+        self._touched = False
+        self._touch_saved_at = 0.0
+        self._lock = threading.Lock()
+        self._load()
+        # 読み込みだけのプロセスでも参照時刻を残す
+        atexit.register(self.flush)
+
+    def compute_key(
+        self,
+        file: Union[str, bytes, IOBase],
+        filename: Optional[str] = None,
+        title: Optional[str] = None,
+    ) -> str:
+        """
+        ファイルのコンテンツハッシュ (SHA-256) とファイル名・タイトルからキャッシュキーを計算
+
+        同じ内容でもファイル名やタイトルが異なる場合は別のファイルとして扱う。
+
+        Args:
+            file (Union[str, bytes, IOBase]): ファイルパス、バイト列またはファイルオブジェクト
+            filename (Optional[str]): アップロード時のファイル名
+            title (Optional[str]): アップロード時のタイトル
+
+        Returns:
+            str: キャッシュキー ("<コンテンツハッシュ>:<ファイル名・タイトルのハッシュ>")
+        """
+        digest = self._content_digest(file)
+        names = json.dumps([filename, title], ensure_ascii=False).encode("utf-8")
+        return f"{digest}:{hashlib.sha256(names).hexdigest()[:16]}"
+
+    def _content_digest(self, file: Union[str, bytes, IOBase]) -> str:
+        if isinstance(file, bytes):
+            return hashlib.sha256(file).hexdigest()
+
+        if isinstance(file, str):
+            path = os.path.abspath(file)
+            st = os.stat(path)
+            with self._lock:
+                stat = self.stats.get(path)
+            if (
+                stat
+                and stat["size"] == st.st_size
+                and stat["mtime_ns"] == st.st_mtime_ns
+            ):
+                return stat["key"]
+
+            with open(path, "rb") as f:
+                key = self._hash_stream(f)
+            with self._lock:
+                self.stats[path] = {
+                    "size": st.st_size,
+                    "mtime_ns": st.st_mtime_ns,
+                    "key": key,
+                }
+            return key
+
+        position = file.tell() if file.seekable() else None
+        key = self._hash_stream(file)
+        if position is not None:
+            file.seek(position)
+        return key
+
+    def get(self, key: str) -> Optional[dict]:
+        """
+        キャッシュされたファイル情報を取得
+
+        Args:
+            key (str): キャッシュキー
+
+        Returns:
+            Optional[dict]: ファイル情報 (id, permalink)。存在しない場合はNone
+        """
+        with self._lock:
+            # 他のプロセスが削除したエントリを返さないよう、ファイルが更新されていれば読み直す
+            if self._file_mtime() != self._mtime_ns:
+                self._load()
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            entry["used_at"] = time.time()
+            self.entries.move_to_end(key)
+            result = {"id": entry["id"], "permalink": entry["permalink"]}
+            self._touched = True
+            if time.monotonic() - self._touch_saved_at >= self.touch_interval:
+                self._save_touched()
+            return result
+
+    def flush(self):
+        """保存していない参照時刻をディスクに書き込む"""
+        with self._lock:
+            if self._touched:
+                self._save_touched()
+
+    def _save_touched(self):
+        try:
+            with self._file_lock():
+                # 読み直しでは参照時刻の新しい方が残る
+                self._load()
+                self._save()
+        except OSError:
+            # 参照時刻の保存に失敗しても、キャッシュの参照自体は続ける
+            pass
+
+    def put(self, key: str, file_id: str, permalink: Optional[str]):
+        """
+        アップロード済みファイルを登録
+
+        Args:
+            key (str): キャッシュキー
+            file_id (str): SlackのファイルID
+            permalink (Optional[str]): ファイルのパーマリンク
+        """
+        entry = {"id": file_id, "permalink": permalink, "used_at": time.time()}
+        with self._lock, self._file_lock():
+            self._load()
+            self.entries[key] = entry
+            self._save()
+
+    def remove_file_id(self, file_id: str):
+        """
+        指定したファイルIDを参照するエントリを削除
+
+        Args:
+            file_id (str): SlackのファイルID
+        """
+        with self._lock, self._file_lock():
+            self._load()
+            keys = [k for k, v in self.entries.items() if v.get("id") == file_id]
+            if not keys:
+                return
+            for key in keys:
+                del self.entries[key]
+            self._save()
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _hash_stream(self, stream) -> str:
+        digest = hashlib.sha256()
+        while True:
+            chunk = stream.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            digest.update(chunk)
+        return digest.hexdigest()
+
+    @contextmanager
+    def _file_lock(self):
+        # 読み込みから書き込みまでの間に他のプロセスが書き込まないようにする
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        with open(f"{self.path}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _file_mtime(self) -> Optional[int]:
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _load(self):
+        """ディスク上のエントリを読み込み、このプロセスでの参照時刻をマージする
+
+        ディスク上にないエントリは他のプロセスで削除・追い出されたものとして破棄する。
+        """
+        self._mtime_ns = self._file_mtime()
+        data = {}
+        if self._mtime_ns is not None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                data = {}
+
+        entries = OrderedDict()
+        for key, entry in data.get("entries", []):
+            local = self.entries.get(key)
+            if local is not None and local.get("id") == entry.get("id"):
+                entry["used_at"] = max(
+                    entry.get("used_at", 0), local.get("used_at", 0)
+                )
+            entries[key] = entry
+        self.entries = entries
+        self.stats.update(data.get("stats", {}))
+        self._evict()
+
+    def _evict(self):
+        # 参照時刻の古い順に並べ、上限を超えた分を追い出す
+        self.entries = OrderedDict(
+            sorted(self.entries.items(), key=lambda item: item[1].get("used_at", 0))
+        )
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def _save(self):
+        self._evict()
+        # 参照されなくなったパス情報は保存しない
+        digests = {key.split(":")[0] for key in self.entries}
+        self.stats = {p: s for p, s in self.stats.items() if s.get("key") in digests}
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"entries": list(self.entries.items()), "stats": self.stats}, f
+            )
+        os.replace(tmp_path, self.path)
+        self._mtime_ns = self._file_mtime()
+        self._touched = False
+        self._touch_saved_at = time.monotonic()
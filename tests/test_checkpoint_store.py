@@ -0,0 +1,48 @@
+import json
+import time
+
+from utils.checkpoint_store import CheckpointStore
+
+
+def test_update_keeps_high_water_mark(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints.json"), flush_interval=0)
+    store.update("C1", "1700000000.000200")
+    store.update("C1", "1700000000.000100")
+
+    assert store.get("C1") == "1700000000.000200"
+    assert store.get("C2") is None
+
+
+def test_flush_persists_checkpoints(tmp_path):
+    path = str(tmp_path / "checkpoints.json")
+    store = CheckpointStore(path, flush_interval=3600)
+    store.update("C1", "1700000000.000100")
+    store.update("C1", "1700000000.000200")
+    store.flush()
+
+    reloaded = CheckpointStore(path)
+    assert reloaded.channels() == ["C1"]
+    assert reloaded.get("C1") == "1700000000.000200"
+
+
+def test_threads_are_persisted_and_pruned(tmp_path):
+    path = str(tmp_path / "checkpoints.json")
+    now = time.time()
+    store = CheckpointStore(path, flush_interval=3600, max_threads=2)
+    store.update_thread("C1", "1.0", f"{now - 30 * 24 * 3600:.6f}")
+    store.update_thread("C1", "2.0", f"{now - 30:.6f}")
+    store.update_thread("C1", "3.0", f"{now - 20:.6f}")
+    store.update_thread("C2", "4.0", f"{now - 10:.6f}")
+    store.flush()
+
+    reloaded = CheckpointStore(path)
+    assert sorted(t[:2] for t in reloaded.threads()) == [("C1", "3.0"), ("C2", "4.0")]
+
+
+def test_loads_channel_only_format(tmp_path):
+    path = tmp_path / "checkpoints.json"
+    path.write_text(json.dumps({"C1": "1700000000.000100"}))
+
+    store = CheckpointStore(str(path))
+    assert store.get("C1") == "1700000000.000100"
+    assert store.threads() == []
@@ -0,0 +1,142 @@
+import json
+import os
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from services.daemon_client import DaemonClient, DaemonError
+from services.daemon_server import DaemonServer
+from services.message_service import FileUploadResult
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    return DaemonServer(
+        message_service=MagicMock(), socket_path=str(tmp_path / "daemon.sock")
+    )
+
+
+def request(daemon, command, **args):
+    line = json.dumps({"command": command, "args": args}).encode("utf-8")
+    return json.loads(daemon.handle_request(line))
+
+
+def test_handle_request_returns_json_results(daemon):
+    daemon.message_service.send_message.return_value = SimpleNamespace(
+        data={"ok": True, "ts": "1.0"}
+    )
+    daemon.message_service.send_message_with_files.return_value = {
+        "ok": True,
+        "results": [FileUploadResult(filename="a.txt", ok=True, file_id="F1")],
+    }
+
+    assert request(daemon, "ping") == {"ok": True, "result": {"pong": True}}
+    assert request(daemon, "send_message", channel_id="C1", text="hi") == {
+        "ok": True,
+        "result": {"ok": True, "ts": "1.0"},
+    }
+    daemon.message_service.send_message.assert_called_once_with("C1", "hi")
+
+    response = request(
+        daemon,
+        "send_message_with_files",
+        channel_id="C1",
+        text="files",
+        files=[{"file": "a.txt"}],
+    )
+    assert response["result"]["results"][0]["file_id"] == "F1"
+
+
+def test_handle_request_reports_errors(daemon):
+    assert request(daemon, "unknown")["ok"] is False
+    assert request(daemon, "send_message", channel="C1")["ok"] is False
+    assert json.loads(daemon.handle_request(b"not json"))["ok"] is False
+
+
+def test_wait_for_message_filters_and_times_out(daemon):
+    since = time.time()
+    timer = threading.Timer(
+        0.1,
+        lambda: [
+            daemon._on_event({"type": "message", "user": "U2", "text": "other"}),
+            daemon._on_event({"type": "message", "user": "U1", "text": "hello"}),
+        ],
+    )
+    timer.start()
+
+    response = request(
+        daemon, "wait_for_message", user_id="U1", since=since, wait_time=5
+    )
+    assert response["result"]["text"] == "hello"
+
+    response = request(
+        daemon, "wait_for_message", user_id="U3", since=since, wait_time=0.1
+    )
+    assert response == {"ok": True, "result": None}
+
+
+def test_download_file_only_sends_token_to_slack(daemon, tmp_path):
+    daemon.http = MagicMock()
+    daemon.http.get.return_value.content = b"data"
+    path = str(tmp_path / "out" / "file.txt")
+
+    for url, target in [
+        ("https://example.com/file.txt", path),
+        ("http://files.slack.com/files-pri/T1-F1/file.txt", path),
+        ("https://files.slack.com/files-pri/T1-F1/file.txt", "file.txt"),
+    ]:
+        assert request(daemon, "download_file", url=url, path=target)["ok"] is False
+    daemon.http.get.assert_not_called()
+
+    url = "https://files.slack.com/files-pri/T1-F1/file.txt"
+    assert request(daemon, "download_file", url=url, path=path)["result"] == path
+    with open(path, "rb") as f:
+        assert f.read() == b"data"
+
+
+def test_serve_forever_over_socket(daemon):
+    thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+    thread.start()
+    client = DaemonClient(daemon.socket_path, timeout=5.0)
+    deadline = time.monotonic() + 5
+    while not client.is_available() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    try:
+        assert client.call("ping") == {"pong": True}
+        with pytest.raises(DaemonError):
+            client.call("unknown")
+
+        # 起動中のデーモンのソケットは削除しない
+        second = DaemonServer(
+            message_service=MagicMock(), socket_path=daemon.socket_path
+        )
+        with pytest.raises(RuntimeError):
+            second.serve_forever()
+        assert client.is_available()
+    finally:
+        daemon.shutdown()
+        thread.join(5)
+
+
+def test_client_refuses_socket_owned_by_another_user(daemon, monkeypatch):
+    thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+    thread.start()
+    client = DaemonClient(daemon.socket_path, timeout=5.0)
+    deadline = time.monotonic() + 5
+    while not client.is_available() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    try:
+        owner = os.stat(daemon.socket_path).st_uid
+        monkeypatch.setattr(os, "getuid", lambda: owner + 1)
+        assert not client.is_available()
+        with pytest.raises(DaemonError):
+            client.call("ping")
+    finally:
+        monkeypatch.undo()
+        daemon.shutdown()
+        thread.join(5)
@@ -0,0 +1,383 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+
+from config.settings import slack_settings
+from services.message_service import FileUploadParams, MessageService
+from utils.checkpoint_store import CheckpointStore
+from utils.rate_limiter import RateLimiter
+from utils.retry import RetryPolicy
+from utils.upload_cache import UploadCache
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    monkeypatch.setattr(slack_settings, "bot_app_id", "A_BOT")
+    service = MessageService(
+        checkpoint_store=CheckpointStore(str(tmp_path / "checkpoints.json"))
+    )
+    service.web_client = MagicMock()
+    service.received = []
+    service.add_message_handler(service.received.append)
+    return service
+
+
+def make_request(event_type, channel, ts, event_id):
+    payload = {
+        "type": "event_callback",
+        "event_id": event_id,
+        "event_time": time.time() + 1,
+        "event": {"type": event_type, "channel": channel, "ts": ts, "user": "U1"},
+    }
+    return SimpleNamespace(payload=payload, envelope_id=event_id)
+
+
+def test_out_of_order_messages_are_all_dispatched(service):
+    client = MagicMock()
+    service._handle_message(client, make_request("message", "C1", "200.0", "Ev2"))
+    service._handle_message(client, make_request("message", "C1", "100.0", "Ev1"))
+
+    assert [e["ts"] for e in service.received] == ["200.0", "100.0"]
+    assert service.checkpoint_store.get("C1") == "200.0"
+
+
+def test_app_mention_is_dispatched_after_its_message(service):
+    client = MagicMock()
+    service._handle_message(client, make_request("message", "C1", "100.0", "Ev1"))
+    service._handle_message(
+        client, make_request("app_mention", "C1", "100.0", "Ev2")
+    )
+    # Slack の再送は重複として除外される
+    service._handle_message(client, make_request("message", "C1", "100.0", "Ev1"))
+
+    assert [e["type"] for e in service.received] == ["message", "app_mention"]
+
+
+def test_catch_up_skips_buffered_events_it_already_delivered(service):
+    service.checkpoint_store.update("C1", "100.0")
+    service.web_client.conversations_history.return_value = {
+        "messages": [
+            {"type": "message", "ts": "102.0", "user": "U1"},
+            {"type": "message", "ts": "101.0", "user": "U1"},
+        ],
+        "has_more": False,
+    }
+    service.socket_client = MagicMock()
+    # キャッチアップ中にライブで受信したイベント
+    service._pending_events = [
+        make_request("message", "C1", "102.0", "Ev1").payload,
+        make_request("message", "C1", "103.0", "Ev2").payload,
+    ]
+
+    service.start()
+
+    assert [e["ts"] for e in service.received] == ["101.0", "102.0", "103.0"]
+    assert service.checkpoint_store.get("C1") == "103.0"
+
+
+def test_catch_up_fetches_missed_thread_replies(service):
+    base = int(time.time())
+    ts = lambda offset: f"{base + offset}.000000"  # noqa: E731
+    service.checkpoint_store.update("C1", ts(100))
+    # 以前に返信のあったスレッド
+    service.checkpoint_store.update_thread("C1", ts(50), ts(60))
+    service.web_client.conversations_history.return_value = {
+        "messages": [
+            {"type": "message", "ts": ts(110), "latest_reply": ts(130)},
+            {"type": "message", "ts": ts(105)},
+        ],
+        "has_more": False,
+    }
+    replies = {
+        ts(50): [
+            {"type": "message", "ts": ts(50)},
+            {"type": "message", "ts": ts(70), "thread_ts": ts(50)},
+        ],
+        ts(110): [
+            {"type": "message", "ts": ts(110), "latest_reply": ts(130)},
+            {"type": "message", "ts": ts(130), "thread_ts": ts(110)},
+        ],
+    }
+    service.web_client.conversations_replies.side_effect = (
+        lambda channel, ts, **kwargs: {"messages": replies[ts], "has_more": False}
+    )
+
+    assert service.catch_up() == 4
+    assert [e["ts"] for e in service.received] == [
+        ts(70),
+        ts(105),
+        ts(110),
+        ts(130),
+    ]
+    assert sorted(service.checkpoint_store.threads()) == [
+        ("C1", ts(50), ts(70)),
+        ("C1", ts(110), ts(130)),
+    ]
+
+
+class FakeSlackApiError(Exception):
+    def __init__(self, error):
+        super().__init__(error)
+        self.response = {"ok": False, "error": error}
+
+
+def test_deleted_cached_file_is_uploaded_again(service, tmp_path):
+    path = tmp_path / "report.txt"
+    path.write_bytes(b"hello")
+    params = FileUploadParams(file=str(path), title="Report")
+    service.upload_cache = UploadCache(str(tmp_path / "cache.json"))
+    service.upload_cache.put(
+        service._upload_cache_key(params), "F_OLD", "https://example.com/old"
+    )
+    service.web_client.files_info.side_effect = FakeSlackApiError("file_deleted")
+    service.web_client.files_upload_v2.return_value = {
+        "ok": True,
+        "file": {"id": "F_NEW", "permalink": "https://example.com/new"},
+    }
+
+    response = service.send_message_with_file("C1", "report", params)
+
+    assert response["file"]["id"] == "F_NEW"
+    service.web_client.chat_postMessage.assert_not_called()
+    assert service.upload_cache.get(service._upload_cache_key(params)) == {
+        "id": "F_NEW",
+        "permalink": "https://example.com/new",
+    }
+
+
+def test_failed_cached_share_falls_back_to_upload(service, tmp_path):
+    path = tmp_path / "report.txt"
+    path.write_bytes(b"hello")
+    params = FileUploadParams(file=str(path))
+    service.upload_cache = UploadCache(str(tmp_path / "cache.json"))
+    service.upload_cache.put(
+        service._upload_cache_key(params), "F_OLD", "https://example.com/old"
+    )
+    service.web_client.chat_postMessage.side_effect = FakeSlackApiError(
+        "channel_not_found"
+    )
+    service.web_client.files_upload_v2.return_value = {
+        "ok": True,
+        "file": {"id": "F_NEW", "permalink": "https://example.com/new"},
+    }
+
+    response = service.send_message_with_file("C1", "report", params)
+
+    assert response["file"]["id"] == "F_NEW"
+    service.web_client.files_upload_v2.assert_called_once()
+
+
+@pytest.mark.parametrize("thread_ts", [None, "100.0"])
+def test_retry_after_landed_post_returns_existing_message(service, thread_ts):
+    service.retry_policy = RetryPolicy(base_delay=0)
+    service.web_client.chat_postMessage.side_effect = ConnectionError("reset")
+    landed = {
+        "ts": "200.0",
+        "metadata": {
+            "event_type": "assistant_bot_message",
+            "event_payload": {"client_msg_id": "msg-1"},
+        },
+    }
+    history = {"messages": [{"ts": "100.0"}, landed]}
+    service.web_client.conversations_history.return_value = history
+    service.web_client.conversations_replies.return_value = history
+
+    response = service._post_message(
+        "C1", client_msg_id="msg-1", text="hello", thread_ts=thread_ts
+    )
+
+    assert response["ts"] == "200.0"
+    service.web_client.chat_postMessage.assert_called_once()
+    lookup = (
+        service.web_client.conversations_replies
+        if thread_ts
+        else service.web_client.conversations_history
+    )
+    # ローカルの時計が進んでいても見逃さないよう、余裕を持って遡る
+    assert float(lookup.call_args.kwargs["oldest"]) < time.time() - 30
+    if thread_ts:
+        service.web_client.conversations_replies.assert_called_once()
+        assert service.web_client.conversations_replies.call_args.kwargs["ts"] == (
+            thread_ts
+        )
+        service.web_client.conversations_history.assert_not_called()
+    else:
+        service.web_client.conversations_replies.assert_not_called()
+
+    # 同じIDでの再送は送信済みの結果を返す
+    assert service._post_message("C1", client_msg_id="msg-1", text="hello") is (
+        response
+    )
+    service.web_client.chat_postMessage.assert_called_once()
+
+
+def test_generated_message_ids_are_not_remembered(service):
+    service.web_client.chat_postMessage.return_value = {"ok": True, "ts": "1.0"}
+    service._post_message("C1", text="hello")
+
+    assert len(service.sent_messages) == 0
+
+
+def failing_chunks():
+    yield "Hello"
+    yield ", wor"
+    raise RuntimeError("generation failed")
+
+
+async def afailing_chunks():
+    for chunk in failing_chunks():
+        yield chunk
+
+
+def test_interrupted_stream_is_finalized(service):
+    service.update_limiter = RateLimiter(0)
+    service.web_client.chat_postMessage.return_value = {"ok": True, "ts": "1.0"}
+
+    for send in (
+        lambda: service.send_message_stream("C1", failing_chunks()),
+        lambda: asyncio.run(service.asend_message_stream("C1", afailing_chunks())),
+    ):
+        service.web_client.chat_update.reset_mock()
+        response = send()
+
+        assert response["ok"] is False
+        assert response["error"] == "generation failed"
+        assert response["messages"] == ["1.0"]
+        service.web_client.chat_update.assert_called_once_with(
+            channel="C1", ts="1.0", text="Hello, wor"
+        )
+
+
+@pytest.fixture
+def batch_service(service):
+    def get_upload_url(filename, length, snippet_type=None):
+        if filename == "broken.txt":
+            raise FakeSlackApiError("invalid_arguments")
+        return {"upload_url": f"https://upload/{filename}", "file_id": f"F_{filename}"}
+
+    def complete_upload(files, **kwargs):
+        return {
+            "ok": True,
+            "files": [
+                {"id": f["id"], "permalink": f"https://example.com/{f['id']}"}
+                for f in files
+            ],
+        }
+
+    service.web_client.files_getUploadURLExternal.side_effect = get_upload_url
+    service.web_client.files_completeUploadExternal.side_effect = complete_upload
+    service.upload_session = MagicMock()
+    return service
+
+
+def test_send_message_with_files_uploads_in_parallel(batch_service):
+    # 2件の転送が同時に進まなければ Barrier がタイムアウトする
+    barrier = threading.Barrier(2, timeout=5)
+
+    def post(url, data, timeout):
+        assert timeout == (
+            slack_settings.upload_connect_timeout,
+            slack_settings.upload_read_timeout,
+        )
+        barrier.wait()
+        return MagicMock()
+
+    batch_service.upload_session.post.side_effect = post
+    files = [
+        FileUploadParams(file=b"aaa", filename="a.txt"),
+        FileUploadParams(file=b"bbbbb", filename="b.txt"),
+    ]
+    progress = []
+
+    response = batch_service.send_message_with_files(
+        "C1", "files", files, progress_callback=lambda *p: progress.append(p)
+    )
+
+    assert response["ok"] is True
+    assert [r.file_id for r in response["results"]] == ["F_a.txt", "F_b.txt"]
+    assert progress[-1] == (2, 2, 8, 8)
+    assert [p[0] for p in progress] == [1, 2]
+    kwargs = batch_service.web_client.files_completeUploadExternal.call_args.kwargs
+    assert [f["id"] for f in kwargs["files"]] == ["F_a.txt", "F_b.txt"]
+
+
+def test_stalled_upload_times_out_and_is_retried(batch_service):
+    batch_service.retry_policy = RetryPolicy(base_delay=0)
+    batch_service.upload_session.post.side_effect = [
+        requests.exceptions.ReadTimeout("stalled"),
+        MagicMock(),
+    ]
+
+    response = batch_service.send_message_with_files(
+        "C1", "files", [FileUploadParams(file=b"aaa", filename="a.txt")]
+    )
+
+    assert response["results"][0].ok
+    assert batch_service.upload_session.post.call_count == 2
+
+
+def test_send_message_with_files_reports_partial_failure(batch_service):
+    files = [
+        FileUploadParams(file=b"aaa", filename="a.txt"),
+        FileUploadParams(file=b"xx", filename="broken.txt"),
+    ]
+    progress = []
+
+    response = batch_service.send_message_with_files(
+        "C1", "files", files, progress_callback=lambda *p: progress.append(p)
+    )
+
+    ok, failed = response["results"]
+    assert response["ok"] is True
+    assert ok.ok and ok.permalink == "https://example.com/F_a.txt"
+    assert not failed.ok and failed.error == "invalid_arguments"
+    assert response["files"] == [
+        {"id": "F_a.txt", "permalink": "https://example.com/F_a.txt"}
+    ]
+    assert progress[-1] == (2, 2, 5, 5)
+    kwargs = batch_service.web_client.files_completeUploadExternal.call_args.kwargs
+    assert [f["id"] for f in kwargs["files"]] == ["F_a.txt"]
+
+
+def test_send_message_with_files_reuses_cached_files(batch_service, tmp_path):
+    batch_service.upload_cache = UploadCache(str(tmp_path / "cache.json"))
+    cached = FileUploadParams(file=b"cached", filename="cached.txt")
+    fresh = FileUploadParams(file=b"fresh", filename="fresh.txt")
+    batch_service.upload_cache.put(
+        batch_service._upload_cache_key(cached), "F_OLD", "https://example.com/old"
+    )
+
+    response = batch_service.send_message_with_files("C1", "files", [cached, fresh])
+
+    first, second = response["results"]
+    assert first.cached and first.file_id == "F_OLD"
+    assert not second.cached and second.file_id == "F_fresh.txt"
+    batch_service.upload_session.post.assert_called_once()
+    kwargs = batch_service.web_client.files_completeUploadExternal.call_args.kwargs
+    assert [f["id"] for f in kwargs["files"]] == ["F_fresh.txt"]
+    assert kwargs["initial_comment"] == "files\nhttps://example.com/old"
+    assert batch_service.upload_cache.get(
+        batch_service._upload_cache_key(fresh)
+    ) == {"id": "F_fresh.txt", "permalink": "https://example.com/F_fresh.txt"}
+
+
+def test_send_message_with_files_shares_only_cached_files(batch_service, tmp_path):
+    batch_service.upload_cache = UploadCache(str(tmp_path / "cache.json"))
+    cached = FileUploadParams(file=b"cached", filename="cached.txt")
+    batch_service.upload_cache.put(
+        batch_service._upload_cache_key(cached), "F_OLD", "https://example.com/old"
+    )
+    batch_service.web_client.chat_postMessage.return_value = {"ok": True, "ts": "1.0"}
+
+    response = batch_service.send_message_with_files("C1", "files", [cached])
+
+    assert response["ok"] is True
+    batch_service.web_client.files_completeUploadExternal.assert_not_called()
+    assert batch_service.web_client.chat_postMessage.call_args.kwargs["text"] == (
+        "files\nhttps://example.com/old"
+    )
@@ -0,0 +1,83 @@
+import time
+
+from services.message_stream import MessageStream
+from utils.rate_limiter import RateLimiter
+
+
+class FakeSlack:
+    def __init__(self):
+        self.posts = []
+        self.updates = []
+
+    def post_message(self, channel_id, text, thread_ts=None):
+        ts = f"1700000000.00000{len(self.posts) + 1}"
+        self.posts.append({"ts": ts, "text": text, "thread_ts": thread_ts})
+        return {"ok": True, "ts": ts}
+
+    def update_message(self, channel_id, ts, text):
+        self.updates.append({"ts": ts, "text": text})
+        return {"ok": True}
+
+    def stream(self, channel_id, **kwargs):
+        return MessageStream(
+            self.post_message, self.update_message, channel_id, **kwargs
+        )
+
+
+def test_posts_first_chunk_and_updates_on_close():
+    slack = FakeSlack()
+    stream = slack.stream("C1", rate_limiter=RateLimiter(0.1))
+
+    for chunk in ["Hello", ", ", "world"]:
+        stream.write(chunk)
+    # 枠を使い切った後の更新は close() まで見送る
+    assert [p["text"] for p in slack.posts] == ["Hello"]
+    assert [u["text"] for u in slack.updates] == ["Hello, "]
+
+    result = stream.close()
+    assert slack.updates[-1] == {"ts": result["ts"], "text": "Hello, world"}
+    assert result["messages"] == [result["ts"]]
+
+
+def test_splits_long_text_into_thread_replies():
+    slack = FakeSlack()
+    stream = slack.stream("C1", max_chars=10, rate_limiter=RateLimiter(0))
+
+    for chunk in ["aaaa ", "bbbb ", "cccc ", "dddd"]:
+        stream.write(chunk)
+    result = stream.close()
+
+    root_ts = result["ts"]
+    assert len(result["messages"]) == 2
+    assert slack.posts[1]["thread_ts"] == root_ts
+    final_texts = {p["ts"]: p["text"] for p in slack.posts}
+    final_texts.update({u["ts"]: u["text"] for u in slack.updates})
+    assert "".join(final_texts[ts] for ts in result["messages"]) == (
+        "aaaa bbbb cccc dddd"
+    )
+    assert all(len(text) <= 10 for text in final_texts.values())
+
+
+def test_streams_share_update_rate_limit():
+    slack = FakeSlack()
+    limiter = RateLimiter(60)
+    streams = [slack.stream(channel, rate_limiter=limiter) for channel in ("C1", "C2")]
+
+    for stream in streams:
+        stream.write("Hello")
+    for stream in streams:
+        stream.write(", world")
+
+    # 共有の枠を使い切ったストリームは次の flush() まで更新を見送る
+    assert len(slack.posts) == 2
+    assert len(slack.updates) == 1
+    assert not streams[1].needs_flush()
+
+
+def test_rate_limiter_acquire_waits_for_next_slot():
+    limiter = RateLimiter(0.05)
+    start = time.monotonic()
+    for _ in range(3):
+        limiter.acquire()
+
+    assert time.monotonic() - start >= 0.1
@@ -0,0 +1,123 @@
+import threading
+import time
+from unittest.mock import MagicMock
+
+from services.metadata_service import MetadataService
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_concurrent_lookups_share_one_request():
+    web_client = MagicMock()
+    started = threading.Event()
+    release = threading.Event()
+
+    def users_info(user):
+        started.set()
+        release.wait(5)
+        return {"user": {"id": user, "name": "alice"}}
+
+    web_client.users_info.side_effect = users_info
+    metadata = MetadataService(web_client)
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(metadata.get_user("U1", fetch=True))
+        )
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    started.wait(5)
+    assert wait_until(lambda: ("user", "U1") in metadata._inflight)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert web_client.users_info.call_count == 1
+    assert results == [{"id": "U1", "name": "alice"}] * 5
+
+
+def test_concurrent_background_misses_share_one_request():
+    for _ in range(20):
+        web_client = MagicMock()
+
+        def users_info(user):
+            time.sleep(0.001)
+            return {"user": {"id": user, "name": "alice"}}
+
+        web_client.users_info.side_effect = users_info
+        metadata = MetadataService(web_client)
+        barrier = threading.Barrier(32)
+
+        def lookup():
+            barrier.wait()
+            metadata.get_user("U1")
+
+        threads = [threading.Thread(target=lookup) for _ in range(32)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+
+        assert wait_until(lambda: metadata.get_user("U1") is not None)
+        assert wait_until(lambda: not metadata._inflight)
+        assert web_client.users_info.call_count == 1
+
+
+def test_miss_is_fetched_in_background():
+    web_client = MagicMock()
+    web_client.users_info.return_value = {"user": {"id": "U1", "name": "alice"}}
+    metadata = MetadataService(web_client)
+
+    assert metadata.get_user("U1") is None
+    assert wait_until(lambda: metadata.get_user("U1") is not None)
+    assert metadata.get_display_name("U1") == "alice"
+    assert web_client.users_info.call_count == 1
+
+
+def test_failed_lookups_are_cached():
+    web_client = MagicMock()
+    web_client.users_info.side_effect = Exception("user_not_found")
+    metadata = MetadataService(web_client)
+
+    assert metadata.get_user("U404", fetch=True) is None
+    assert metadata.get_user("U404", fetch=True) is None
+    assert metadata.get_user("U404") is None
+    assert web_client.users_info.call_count == 1
+
+    metadata.handle_event({"type": "team_join", "user": {"id": "U404", "name": "bob"}})
+    assert metadata.get_user("U404") == {"id": "U404", "name": "bob"}
+
+
+def test_handle_event_updates_cache():
+    web_client = MagicMock()
+    metadata = MetadataService(web_client)
+    metadata.users.set("U1", {"id": "U1", "name": "alice"})
+    metadata.channels.set("C1", {"id": "C1", "name": "general"})
+    metadata.channels.set("C2", {"id": "C2", "name": "random"})
+
+    metadata.handle_event(
+        {"type": "user_change", "user": {"id": "U1", "name": "alice2"}}
+    )
+    metadata.handle_event(
+        {"type": "channel_rename", "channel": {"id": "C1", "name": "announcements"}}
+    )
+    metadata.handle_event({"type": "channel_archive", "channel": "C2"})
+
+    assert metadata.get_user("U1")["name"] == "alice2"
+    assert metadata.get_channel_name("C1") == "announcements"
+    assert metadata.channels.get_entry("C2") == (None, False)
+
+
+def test_explicit_zero_settings_are_respected():
+    metadata = MetadataService(MagicMock(), maxsize=0, ttl=0, negative_ttl=0)
+
+    assert metadata.users.maxsize == 0
+    assert metadata.users.ttl == 0
+    assert metadata.misses.ttl == 0
@@ -0,0 +1,114 @@
+import json
+import logging
+import os
+import pstats
+import signal
+import time
+
+import pytest
+
+from utils.profiler import HandlerProfiler
+
+
+def busy_handler(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+    return "done"
+
+
+def test_cprofile_writes_pstats(tmp_path):
+    profiler = HandlerProfiler(output_dir=str(tmp_path), slow_threshold=None)
+    profiler.enable()
+    assert profiler.call_handler(busy_handler, 0.01) == "done"
+    paths = profiler.disable()
+
+    assert len(paths) == 1 and paths[0].endswith(".prof")
+    stats = pstats.Stats(paths[0])
+    assert any(func[2] == "busy_handler" for func in stats.stats)
+
+
+def test_sampling_writes_speedscope(tmp_path):
+    profiler = HandlerProfiler(
+        output_dir=str(tmp_path),
+        mode="sampling",
+        sampling_interval=0.001,
+        slow_threshold=None,
+    )
+    profiler.enable()
+    profiler.call_handler(busy_handler, 0.1)
+    paths = profiler.disable()
+
+    assert len(paths) == 1 and paths[0].endswith(".speedscope.json")
+    with open(paths[0], encoding="utf-8") as f:
+        data = json.load(f)
+    frames = data["shared"]["frames"]
+    profile = data["profiles"][0]
+    assert profile["type"] == "sampled"
+    assert profile["name"] == "busy_handler"
+    assert profile["samples"]
+    assert len(profile["samples"]) == len(profile["weights"])
+    assert all(0 <= i < len(frames) for stack in profile["samples"] for i in stack)
+    assert any(frame["name"] == "busy_handler" for frame in frames)
+
+
+def test_sampling_worker_survives_errors(tmp_path, monkeypatch, caplog):
+    profiler = HandlerProfiler(
+        output_dir=str(tmp_path),
+        mode="sampling",
+        sampling_interval=0.001,
+        slow_threshold=None,
+    )
+    sample_stacks = profiler._sample_stacks
+    calls = []
+
+    def flaky_sample_stacks():
+        calls.append(None)
+        if len(calls) == 1:
+            raise RuntimeError("boom")
+        sample_stacks()
+
+    monkeypatch.setattr(profiler, "_sample_stacks", flaky_sample_stacks)
+    with caplog.at_level(logging.ERROR, logger="utils.profiler"):
+        profiler.enable()
+        profiler.call_handler(busy_handler, 0.1)
+        paths = profiler.disable()
+
+    assert any(r.getMessage() == "Profiler worker failed" for r in caplog.records)
+    assert len(paths) == 1 and paths[0].endswith(".speedscope.json")
+
+
+def test_slow_handler_is_logged(tmp_path, caplog):
+    profiler = HandlerProfiler(
+        output_dir=str(tmp_path), sample_rate=0, slow_threshold=0.01
+    )
+    with caplog.at_level(logging.WARNING, logger="utils.profiler"):
+        profiler.call_handler(busy_handler, 0)
+        profiler.call_handler(busy_handler, 0.05)
+
+    slow = [r for r in caplog.records if r.getMessage().startswith("Slow")]
+    assert len(slow) == 1
+    assert "busy_handler" in slow[0].getMessage()
+
+
+def test_invalid_mode_only_fails_on_enable(tmp_path):
+    profiler = HandlerProfiler(output_dir=str(tmp_path), mode="unknown")
+
+    with pytest.raises(ValueError):
+        profiler.enable()
+    assert not profiler.enabled
+
+
+def test_signal_toggles_outside_handler(tmp_path):
+    profiler = HandlerProfiler(output_dir=str(tmp_path))
+    previous = signal.getsignal(signal.SIGUSR1)
+    profiler.install_signal_handler(signal.SIGUSR1)
+    try:
+        os.kill(os.getpid(), signal.SIGUSR1)
+        deadline = time.monotonic() + 5
+        while not profiler.enabled and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert profiler.enabled
+    finally:
+        signal.signal(signal.SIGUSR1, previous)
+        profiler.disable()
@@ -0,0 +1,81 @@
+import pytest
+
+from config.settings import slack_settings
+from utils.retry import CircuitOpenError, RetryPolicy
+
+
+class FakeResponse(dict):
+    def __init__(self, status_code, error, headers=None):
+        super().__init__(ok=False, error=error)
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class FakeSlackApiError(Exception):
+    def __init__(self, status_code, error):
+        super().__init__(error)
+        self.response = FakeResponse(status_code, error)
+
+
+def flaky(failures, error):
+    calls = {"count": 0}
+
+    def func():
+        calls["count"] += 1
+        if calls["count"] <= failures:
+            raise error
+        return "ok"
+
+    return func, calls
+
+
+def test_retries_transient_errors():
+    policy = RetryPolicy(max_attempts=3, base_delay=0)
+    func, calls = flaky(2, FakeSlackApiError(503, "service_unavailable"))
+
+    assert policy.call("chat.postMessage", func) == "ok"
+    assert calls["count"] == 3
+
+
+def test_does_not_retry_client_errors():
+    policy = RetryPolicy(max_attempts=3, base_delay=0)
+    func, calls = flaky(1, FakeSlackApiError(200, "channel_not_found"))
+
+    with pytest.raises(FakeSlackApiError):
+        policy.call("chat.postMessage", func)
+    assert calls["count"] == 1
+
+
+def test_retry_budget_limits_retries():
+    policy = RetryPolicy(max_attempts=5, base_delay=0, retry_budget=1)
+    func, calls = flaky(3, ConnectionError())
+
+    with pytest.raises(ConnectionError):
+        policy.call("chat.postMessage", func)
+    assert calls["count"] == 2
+
+
+def test_circuit_opens_after_consecutive_failures():
+    policy = RetryPolicy(
+        max_attempts=1, base_delay=0, failure_threshold=2, reset_timeout=60
+    )
+    func, calls = flaky(10, ConnectionError())
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            policy.call("chat.postMessage", func)
+    with pytest.raises(CircuitOpenError):
+        policy.call("chat.postMessage", func)
+    assert calls["count"] == 2
+
+    # 他のエンドポイントには影響しない
+    assert policy.call("files.delete", lambda: "ok") == "ok"
+
+
+def test_from_settings(monkeypatch):
+    monkeypatch.setattr(slack_settings, "retry_max_attempts", 7)
+    monkeypatch.setattr(slack_settings, "circuit_reset_timeout", 12.0)
+    policy = RetryPolicy.from_settings()
+
+    assert policy.max_attempts == 7
+    assert policy.reset_timeout == 12.0
@@ -0,0 +1,26 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from core.slack_client import SlackClient  # noqa: E402
+from utils.retry import RetryPolicy  # noqa: E402
+
+
+def test_retry_after_landed_post_is_not_sent_twice():
+    client = SlackClient(token="xoxb-test", retry_policy=RetryPolicy(base_delay=0))
+    client.client = AsyncMock()
+    client.client.chat_postMessage.side_effect = asyncio.TimeoutError()
+    client.client.conversations_history.return_value = {
+        "messages": [
+            {
+                "ts": "200.0",
+                "metadata": {"event_payload": {"client_msg_id": "msg-1"}},
+            }
+        ]
+    }
+
+    assert asyncio.run(client.send_message("C1", "hello", client_msg_id="msg-1"))
+    client.client.chat_postMessage.assert_awaited_once()
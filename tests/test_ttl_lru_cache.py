@@ -0,0 +1,24 @@
+import time
+
+from utils.ttl_lru_cache import TTLLRUCache
+
+
+def test_expired_entry_is_kept_as_stale():
+    cache = TTLLRUCache(maxsize=10, ttl=0.01)
+    cache.set("U1", {"name": "alice"})
+    time.sleep(0.02)
+
+    assert cache.get("U1") is None
+    assert cache.get_entry("U1") == ({"name": "alice"}, False)
+
+
+def test_lru_eviction():
+    cache = TTLLRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert len(cache) == 2
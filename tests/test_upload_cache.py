@@ -0,0 +1,86 @@
+import io
+
+from utils.upload_cache import UploadCache
+
+
+def test_compute_key_is_content_addressed(tmp_path):
+    cache = UploadCache(str(tmp_path / "cache.json"))
+    path = tmp_path / "report.txt"
+    path.write_bytes(b"hello")
+
+    key = cache.compute_key(str(path))
+    assert key == cache.compute_key(b"hello")
+    assert key == cache.compute_key(io.BytesIO(b"hello"))
+    assert key == cache.compute_key(io.StringIO("hello"))
+
+    path.write_bytes(b"changed")
+    assert cache.compute_key(str(path)) != key
+
+
+def test_lru_eviction_and_persistence(tmp_path):
+    cache_path = str(tmp_path / "cache.json")
+    cache = UploadCache(cache_path, maxsize=2)
+    cache.put("a", "F1", "https://example.com/a")
+    cache.put("b", "F2", "https://example.com/b")
+    cache.get("a")
+    cache.put("c", "F3", "https://example.com/c")
+
+    assert "a" in cache
+    assert "b" not in cache
+
+    reloaded = UploadCache(cache_path, maxsize=2)
+    assert reloaded.get("c") == {"id": "F3", "permalink": "https://example.com/c"}
+
+
+def test_remove_file_id(tmp_path):
+    cache = UploadCache(str(tmp_path / "cache.json"))
+    cache.put("a", "F1", "https://example.com/a")
+    cache.remove_file_id("F1")
+
+    assert cache.get("a") is None
+    assert len(UploadCache(str(tmp_path / "cache.json"))) == 0
+
+
+def test_key_includes_filename_and_title(tmp_path):
+    cache = UploadCache(str(tmp_path / "cache.json"))
+    key = cache.compute_key(b"hello", filename="a.txt", title="A")
+
+    assert key == cache.compute_key(b"hello", filename="a.txt", title="A")
+    assert key != cache.compute_key(b"hello", filename="b.txt", title="A")
+    assert key != cache.compute_key(b"hello", filename="a.txt", title="B")
+
+
+def test_save_merges_changes_from_other_processes(tmp_path):
+    cache_path = str(tmp_path / "cache.json")
+    first = UploadCache(cache_path)
+    second = UploadCache(cache_path)
+    first.put("a", "F1", "https://example.com/a")
+    first.put("b", "F2", "https://example.com/b")
+
+    assert second.get("a") is not None
+    first.remove_file_id("F1")
+    second.put("c", "F3", "https://example.com/c")
+
+    reloaded = UploadCache(cache_path)
+    assert "a" not in reloaded
+    assert "b" in reloaded
+    assert "c" in reloaded
+    assert second.get("a") is None
+
+
+def test_hits_keep_entries_alive_across_instances(tmp_path):
+    cache_path = str(tmp_path / "cache.json")
+    first = UploadCache(cache_path, maxsize=2)
+    first.put("k1", "F1", "https://example.com/1")
+    first.put("k2", "F2", "https://example.com/2")
+
+    # 読み込みだけのプロセスでの参照も、次の書き込みで考慮される
+    reader = UploadCache(cache_path, maxsize=2, touch_interval=60)
+    assert reader.get("k1") is not None
+    reader.flush()
+    UploadCache(cache_path, maxsize=2).put("k3", "F3", "https://example.com/3")
+
+    reloaded = UploadCache(cache_path, maxsize=2)
+    assert "k1" in reloaded
+    assert "k2" not in reloaded
+    assert "k3" in reloaded